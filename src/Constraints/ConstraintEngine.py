@@ -0,0 +1,152 @@
+class Constraint:
+    """
+    Constraint class describing one check of a scenario declaratively: a statistic of the layout that must stay at or above
+    (min) or at or below (max) a bound. The statistic and the bound are functions of the LayoutStatistics, so bounds that
+    scale with the layout, such as 20% of all credits, are written the same way as fixed ones.
+
+    Attributes:
+        name (string): name of the constraint, returned as the violation
+        kind (string): "min" if the statistic must not fall below the bound, "max" if it must not exceed it
+        statistic (function): LayoutStatistics -> value that is checked
+        bound (function): LayoutStatistics -> bound the value is compared against
+    """
+
+    __slots__ = ("name", "kind", "statistic", "bound")
+
+    def __init__(self, name, kind, statistic, bound):
+        """
+        Constructor for the Constraint class
+
+        :param name (string): name of the constraint
+        :param kind (string): "min" or "max"
+        :param statistic (function): LayoutStatistics -> value that is checked
+        :param bound (function or number): LayoutStatistics -> bound, or a fixed bound
+        """
+        if kind not in ("min", "max"):
+            raise ValueError("constraint kind must be min or max, not " + str(kind))
+        self.name = name
+        self.kind = kind
+        self.statistic = statistic
+        self.bound = bound if callable(bound) else (lambda stats, bound=bound: bound)
+
+    def check(self, stats):
+        """
+        Method to check the constraint against the statistics of a layout
+
+        :param stats (LayoutStatistics): statistics of the layout
+        :return: (violated, slack, bound). slack is how far the value is inside the bound, negative when violated
+        """
+        value = self.statistic(stats)
+        bound = self.bound(stats)
+        if self.kind == "min":
+            return value < bound, value - bound, bound
+        return value > bound, bound - value, bound
+
+
+class ConstraintResult:
+    """
+    ConstraintResult class holding everything one check of a layout found out
+
+    Attributes:
+        stats (LayoutStatistics): statistics of the layout
+        violation (string): name of the first violated constraint, or None if the layout is valid
+        fitness (number): objective value if the layout is valid, the penalty otherwise
+        slack (dict): constraint name -> slack, for every constraint that was checked
+        bounds (dict): constraint name -> bound, for every constraint that was checked
+    """
+
+    __slots__ = ("stats", "violation", "fitness", "slack", "bounds")
+
+    def __init__(self, stats, violation, fitness, slack, bounds):
+        self.stats = stats
+        self.violation = violation
+        self.fitness = fitness
+        self.slack = slack
+        self.bounds = bounds
+
+
+class ConstraintEngine:
+    """
+    ConstraintEngine class that checks a layout against the ordered constraints of a scenario. The statistics of the layout are
+    kept up to date by the grid as trees are planted and removed, and the constraints are checked against them in order,
+    stopping at the first violation unless the slack of every constraint is asked for. evaluate() and validate() of a scenario
+    are both answered from the same exact check, whose float totals are added up tree by tree, so they can never disagree and
+    their fitness is the same bit for bit as a scan of the grid.
+
+    Attributes:
+        constraints (list): Constraint objects in the order they are checked
+        objective (function): LayoutStatistics -> fitness of a valid layout
+        penalty (number): fitness of a layout that violates a constraint
+        catalog (SpeciesCatalog): catalog of tree type attributes
+    """
+
+    def __init__(self, constraints, objective, penalty, catalog):
+        """
+        Constructor for the ConstraintEngine class
+
+        :param constraints (list): Constraint objects in the order they are checked
+        :param objective (function): LayoutStatistics -> fitness of a valid layout
+        :param penalty (number): fitness of a layout that violates a constraint
+        :param catalog (SpeciesCatalog): catalog of tree type attributes
+        """
+        self.constraints = list(constraints)
+        self.objective = objective
+        self.penalty = penalty
+        self.catalog = catalog
+
+    def statistics(self, layout, exact=False):
+        """
+        Method to get the statistics of a layout, which the grid keeps up to date as trees are planted and removed
+
+        :param layout (Grid): grid holding the trees
+        :param exact (bool): add up the float statistics tree by tree, as the fitness is taken from them
+        :return: LayoutStatistics object
+        """
+        if exact:
+            return layout.stats.exact(layout.records())
+        return layout.stats
+
+    def check(self, layout, all_slack=False, exact=False):
+        """
+        Method to check a layout against the constraints
+
+        :param layout (Grid): grid holding the trees
+        :param all_slack (bool): check every constraint to get its slack instead of stopping at the first violation
+        :param exact (bool): check exact statistics, bit for bit the same as a scan of the grid, instead of the quick ones
+        :return: ConstraintResult object
+        """
+        return self.check_statistics(self.statistics(layout, exact), all_slack)
+
+    def check_statistics(self, stats, all_slack=False):
+        """
+        Method to check already computed layout statistics against the constraints
+
+        :param stats (LayoutStatistics): statistics of the layout
+        :param all_slack (bool): check every constraint to get its slack instead of stopping at the first violation
+        :return: ConstraintResult object
+        """
+        violation = None
+        slack = {}
+        bounds = {}
+        for constraint in self.constraints:
+            violated, slack[constraint.name], bounds[constraint.name] = constraint.check(stats)
+            if violated and violation is None:
+                violation = constraint.name
+                if not all_slack:
+                    break
+        fitness = self.penalty if violation is not None else self.objective(stats)
+        return ConstraintResult(stats, violation, fitness, slack, bounds)
+
+
+def road_interval(count, total_interval):
+    """
+    Method to get the length of road covered by trees planted along it, from their number and their total width. No trees
+    cover no road.
+
+    :param count (int): number of trees planted along the road
+    :param total_interval (float): total width of the trees
+    :return: length of road covered
+    """
+    if count == 0:
+        return 0
+    return count * (total_interval / count)
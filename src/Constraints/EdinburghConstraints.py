@@ -1,4 +1,6 @@
-from Environment.Grid import Grid
+from Environment.Site import Site
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Constraints.ConstraintEngine import Constraint, ConstraintEngine
 class EdinburghConstraints:
     """
     Defines the fitness function for the genetic algorithm when running the Sundial Garden, Inverleith Park, Edinburgh scenario
@@ -9,6 +11,8 @@ class EdinburghConstraints:
         cost_limit: int - The cost limit of the garden
         tree_types_dict: dict - Dictionary containing the tree types ID to species name
         generator: TreeGenerator - TreeGenerator object that generates trees
+        catalog: SpeciesCatalog - Catalog of tree type attributes, indexed by tree type id
+        engine: ConstraintEngine - Checks layouts against the constraints of the garden
     """
 
     def __init__(self, grid_width, grid_height, cost, tree_types_dict, generator):
@@ -25,7 +29,46 @@ class EdinburghConstraints:
         self.cost_limit = cost
         self.tree_types_dict = tree_types_dict
         self.generator = generator
-        self.planting_areas = Grid(grid_width, grid_height, 3)
+        self.catalog = SpeciesCatalog.load()
+        self.planting_areas = Site.load(3)
+        self.engine = ConstraintEngine(self.constraints(), lambda stats: stats.total_co2, -100, self.catalog)
+
+    def __getstate__(self):
+        #the constraints are lambdas, so the engine is built again when unpickled, such as in an evaluation worker
+        state = self.__dict__.copy()
+        del state["engine"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.engine = ConstraintEngine(self.constraints(), lambda stats: stats.total_co2, -100, self.catalog)
+
+    def constraints(self):
+        """
+        Defines the constraints for Edinburgh, in the order they are checked
+        :return: list of Constraint objects
+        """
+        return [
+            #tree ratio constraints
+            Constraint("too_many_trees", "max", lambda stats: stats.total_trees, 45),
+            Constraint("min_evergreen_to_all", "min", lambda stats: stats.total_quantity_credit_evergreen,
+                       lambda stats: 0.2 * (stats.total_quantity_credit_evergreen + stats.total_quantity_credit_deciduous)),
+            Constraint("min_large_to_all", "min", lambda stats: stats.total_large_trees,
+                       lambda stats: 0.06 * stats.total_trees),
+            Constraint("min_trees_to_landscape", "min",
+                       lambda stats: stats.total_quantity_credit_evergreen + stats.total_quantity_credit_deciduous,
+                       0.001 * (23358)), #23358 squares are plantable in the garden
+            #canopy coverage constraints
+            Constraint("max_canopy_coverage", "max", lambda stats: stats.total_crown_area, 0.015 * (23358)),
+            Constraint("min_canopy_coverage", "min", lambda stats: stats.total_crown_area, 0.008 * (23358)),
+            #tree count constraints
+            Constraint("min_evergreen_count", "min", lambda stats: stats.total_evergreen_trees,
+                       lambda stats: 0.015 * (stats.total_evergreen_trees + stats.total_deciduous_trees)),
+            Constraint("min_deciduous_count", "min", lambda stats: stats.total_deciduous_trees,
+                       lambda stats: 0.015 * (stats.total_evergreen_trees + stats.total_deciduous_trees)),
+            #cost constraint
+            Constraint("total_cost", "max", lambda stats: stats.total_cost, self.cost_limit),
+        ]
 
     def evaluate(self, individual):
         """
@@ -34,183 +77,28 @@ class EdinburghConstraints:
         :param individual: chromosome to evaluate
         :return: integer value of the fitness
         """
+        result = self.engine.check(individual.grid, exact=True)
+        if result.violation is not None:
+            print(result.violation)
+        return result.fitness,
 
-        #keep track of total cost and total co2 absorption
-        total_cost = 0
-        total_co2 = 0
-        #flatten the grid
-        individual = individual.grid.numerical_grid.flatten()
-        grid = [individual[i:i+ self.GRID_WIDTH] for i in range(0, len(individual), self.GRID_WIDTH)]
-
-        #variables to keep track of tree statistics
-        total_quantity_credit_evergreen = 0
-        total_quantity_credit_deciduous = 0
-        total_trees = 0
-        total_evergreen_trees = 0
-        total_deciduous_trees = 0
-        total_large_trees = 0 #large trees are trees with radius >= 20
-        total_crown_area = 0
-
-        #iterate through the grid and increment tree statistics
-        for y, row in enumerate(grid):
-            for x, cell in enumerate(row):
-                if cell > 0:
-                    tree = self.generator.generateTree(self.tree_types_dict[cell], (x, y))
-                    total_cost += tree.getPrice()
-                    total_co2 += tree.getCo2Absorption()
-                    leaf_type = tree.getLeafType()
-                    if leaf_type == "Evergreen":
-                        total_quantity_credit_evergreen += tree.getCreditValue()
-                        total_evergreen_trees += 1
-                    elif leaf_type == "Deciduous":
-                        total_quantity_credit_deciduous += tree.getCreditValue()
-                        total_deciduous_trees += 1
-                    if tree.getTreeCategory() == "Large":
-                        total_large_trees += 1
-
-                    total_trees += 1
-                    total_crown_area += tree.getCrownArea()
-
-
-        #values for constraints for Edinburgh
-        #############################
-        min_trees_to_landscape = 0.001 * (23358) #7326 meters squared is plantable area of apartment complex
-        min_evergreen_to_all = 0.2 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_large_to_all = 0.06 * total_trees
-        max_canopy_coverage = 0.015 * (23358) #-1 because some regions not plantable
-        min_canopy_coverage = 0.008 * (23358) #-1 because some regions not plantable
-        min_evergreen_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        min_deciduous_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        #############################
-
-        #################TREE RATIO CONSTRAINTS################
-        if total_trees > 45:
-            print("too_many_trees")
-            return -100,
-
-        if total_quantity_credit_evergreen + total_quantity_credit_deciduous < min_trees_to_landscape:
-            print("total_quantity_credit_evergreen")
-            return -100,
-        elif total_quantity_credit_evergreen < min_evergreen_to_all:
-            print("total_quantity_credit_evergreen")
-            return -100,
-        elif total_large_trees < min_large_to_all:
-            print("total_large_trees")
-            return -100,
-
-        ################CANOPY COVERAGE CONSTRAINTS############
-        if total_crown_area > max_canopy_coverage:
-            print("total_crown_area above")
-            return -100,
-        elif total_crown_area < min_canopy_coverage:
-            print("total_crown_area below")
-            return -100,
-
-        ################TREE COUNT CONSTRAINTS################
-        if total_evergreen_trees < min_evergreen_count:
-            print("total_evergreen_trees")
-            return -100,
-        elif total_deciduous_trees < min_deciduous_count:
-            print("total_deciduous_trees")
-            return -100,
-
-        ################COST CONSTRAINTS################
-        if total_cost > self.cost_limit:
-            print("total_cost")
-            return -100,
-        return total_co2,
-
-    def validate(self, individual):
+    def validate(self, layout):
         """
-        Validates the individual against the constraints. If the individual violates any of the constraints, the function prints the constraint violated.
+        Validates the individual against the constraints. If the individual violates any of the constraints, the function returns the constraint violated.
         This is used to initalise the chromosomes in the greedy algorithm by determining if the chromosome is valid or what constraint is currently violated.
-        :param individual: chromosome to validate
-        :return: string of the constraint violated or "VALID" if the individual is valid
+        :param layout (Grid): grid holding the trees to validate
+        :return: string of the constraint violated, or None if the individual is valid
         """
-
-        #keep track of total cost and total co2 absorption
-        total_cost = 0
-        total_co2 = 0
-        #flatten the grid
-        grid = [individual[i:i+ self.GRID_WIDTH] for i in range(0, len(individual), self.GRID_WIDTH)]
-
-        #variables to keep track of tree statistics
-        total_quantity_credit_evergreen = 0
-        total_quantity_credit_deciduous = 0
-        total_trees = 0
-        total_evergreen_trees = 0
-        total_deciduous_trees = 0
-        total_large_trees = 0 #large trees are trees with radius >= 20
-        total_crown_area = 0
-
-        #iterate through the grid and increment tree statistics
-        for y, row in enumerate(grid):
-            for x, cell in enumerate(row):
-                if cell > 0: #only check base of tree
-                    tree = self.generator.generateTree(self.tree_types_dict[cell], (x, y))
-                    total_cost += tree.getPrice()
-                    total_co2 += tree.getCo2Absorption()
-                    leaf_type = tree.getLeafType()
-                    if leaf_type == "Evergreen":
-                        total_quantity_credit_evergreen += tree.getCreditValue()
-                        total_evergreen_trees += 1
-                    elif leaf_type == "Deciduous":
-                        total_quantity_credit_deciduous += tree.getCreditValue()
-                        total_deciduous_trees += 1
-                    if tree.getTreeCategory() == "Large":
-                        total_large_trees += 1
-
-                    total_trees += 1
-                    total_crown_area += tree.getCrownArea()
-
-        #values for constraints for Edinburgh
-        #############################
-        min_trees_to_landscape = 0.001 * (23358) #7326 meters squared is plantable area of apartment complex
-        min_evergreen_to_all = 0.2 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_large_to_all = 0.06 * total_trees
-        max_canopy_coverage = 0.015 * (23358) #-1 because some regions not plantable
-        min_canopy_coverage = 0.008 * (23358) #-1 because some regions not plantable
-        min_evergreen_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        min_deciduous_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        #############################
-
-        #############TREE RATIO CONSTRAINTS################
-        if total_trees > 45:
-            return "too_many_trees"
-        if total_quantity_credit_evergreen < min_evergreen_to_all:
-            #print("Not enough evergreen trees to all trees " + str(total_quantity_credit_evergreen) + " < " +  str(min_evergreen_to_all))
-            return "min_evergreen_to_all"
-        elif total_large_trees < min_large_to_all:
-            #print("Not enough large trees to all trees " + str(total_large_trees) + " < " + str(min_large_to_all))
-            return "min_large_to_all"
-        elif total_quantity_credit_evergreen + total_quantity_credit_deciduous < min_trees_to_landscape:
-            #print("Not enough trees to landscape " + str(total_quantity_credit_evergreen) + " + " + str(total_quantity_credit_deciduous) + " < " + str(min_trees_to_landscape))
-            return "min_trees_to_landscape"
-        ############CANOPY COVERAGE CONSTRAINTS############
-        if total_crown_area > max_canopy_coverage:
-            #print("Canopy coverage exceeds " + str(total_crown_area))
-            return "max_canopy_coverage"
-        elif total_crown_area < min_canopy_coverage:
-            #print("Canopy coverage below " + str(total_crown_area))
-            return "min_canopy_coverage"
-        ############TREE COUNT CONSTRAINTS################
-        if total_evergreen_trees < min_evergreen_count:
-            #print("Not enough evergreen trees " + str(total_evergreen_trees) + " < " + str(min_evergreen_count))
-            return "min_evergreen_count"
-        elif total_deciduous_trees < min_deciduous_count:
-            #print("Not enough deciduous trees " + str(total_deciduous_trees) + " < " + str(min_deciduous_count))
-            return "min_deciduous_count"
-        ############COST CONSTRAINTS################
-        if total_cost > self.cost_limit:
-            #print("Cost exceeds " + str(total_cost))
-            return "total_cost"
-
+        result = self.engine.check(layout, exact=True)
+        if result.violation is not None:
+            return result.violation
 
         #############VALID################
+        stats, bounds = result.stats, result.bounds
         print("VALID --- STATISTICS")
-        print("Total CO2 Intake: " + str(total_co2))
-        print("Trees to landscape - " + str(total_quantity_credit_evergreen) + " + " + str(total_quantity_credit_deciduous) + " > " + str(min_trees_to_landscape))
-        print("Evergreen to all - " + str(total_quantity_credit_evergreen) + " > " +  str(min_evergreen_to_all))
-        print("Large to all - " + str(total_large_trees) + " > " + str(min_large_to_all))
-        print("Canopy coverage - " + str(total_crown_area) + " < " + str(max_canopy_coverage) + " and > " + str(min_canopy_coverage))
-        print("Cost - " + str(total_cost) + " < " + str(self.cost_limit))
+        print("Total CO2 Intake: " + str(stats.total_co2))
+        print("Trees to landscape - " + str(stats.total_quantity_credit_evergreen) + " + " + str(stats.total_quantity_credit_deciduous) + " > " + str(bounds["min_trees_to_landscape"]))
+        print("Evergreen to all - " + str(stats.total_quantity_credit_evergreen) + " > " +  str(bounds["min_evergreen_to_all"]))
+        print("Large to all - " + str(stats.total_large_trees) + " > " + str(bounds["min_large_to_all"]))
+        print("Canopy coverage - " + str(stats.total_crown_area) + " < " + str(bounds["max_canopy_coverage"]) + " and > " + str(bounds["min_canopy_coverage"]))
+        print("Cost - " + str(stats.total_cost) + " < " + str(self.cost_limit))
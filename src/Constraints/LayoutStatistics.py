@@ -0,0 +1,251 @@
+import numpy as np
+
+#zone a tree base counts towards, checked in the order hedge, road, pedestrian road
+ZONE_OTHER, ZONE_HEDGE, ZONE_ROAD, ZONE_PEDESTRIAN = range(4)
+
+#zone maps already built in this process, keyed by site name
+_zone_maps = {}
+
+
+def sequential_sum(values):
+    """
+    Method to add up float values one at a time from the first to the last, the same as a loop of +=. A pairwise sum or a dot
+    product can round differently, so exact float totals go through here to stay bit for bit the same as the loop.
+
+    :param values (numpy array): 1D array of values in the order they are added
+    :return: the total, or 0 if there are no values
+    """
+    if len(values) == 0:
+        return 0
+    return np.cumsum(values)[-1].item()
+
+
+def zone_map(site):
+    """
+    Method to get the zone of every square of a site that the constraints count a tree in. A square in several zones counts
+    towards the first of hedge, road and pedestrian road.
+
+    :param site (Site): site to map
+    :return: 2D int8 numpy array of ZONE_ values
+    """
+    if site.name not in _zone_maps:
+        zones = np.full((site.y, site.x), ZONE_OTHER, dtype=np.int8)
+        zones[site.pedestrian_road] = ZONE_PEDESTRIAN
+        zones[site.road] = ZONE_ROAD
+        zones[site.hedge] = ZONE_HEDGE
+        zones.flags.writeable = False
+        _zone_maps[site.name] = zones
+    return _zone_maps[site.name]
+
+
+class LayoutStatistics:
+    """
+    LayoutStatistics class holding the running tree statistics of a layout that the constraints are checked against. The layout
+    is summarised as a count of trees per zone and tree type, which is updated by one increment whenever a tree is planted or
+    removed. Every statistic is then a dot product of the counts against the attribute arrays of the species catalog, so
+    checking the constraints costs the same however many trees are planted. Float totals taken from the counts are the count
+    of each tree type times its value, which can round differently in the last bit from adding the trees one by one, so they
+    are only used for quick checks such as the greedy repair. The statistics that fitness is taken from are made exact with
+    exact(), which adds the float values up tree by tree in row by row order, the same as a scan of the grid.
+    The statistics the constraints use, such as total_cost, total_co2 or num_native_road, are read-only properties.
+
+    Attributes:
+        catalog (SpeciesCatalog): catalog of tree type attributes
+        zones (numpy array): 2D array of the zone of each square, from zone_map
+        counts (numpy array): 2D int array of the number of trees per zone and tree type
+        records (numpy array): TREE_RECORD records of the layout sorted row by row if the statistics are exact, or None
+        record_zones (numpy array): zone of each of the records if the statistics are exact, or None
+    """
+
+    __slots__ = ("catalog", "zones", "counts", "records", "record_zones")
+
+    def __init__(self, catalog, site):
+        """
+        Constructor for the LayoutStatistics class, for an empty layout
+
+        :param catalog (SpeciesCatalog): catalog of tree type attributes
+        :param site (Site): site of the layout
+        """
+        self.catalog = catalog
+        self.zones = zone_map(site)
+        self.counts = np.zeros((4, len(catalog)), dtype=np.int64)
+        self.records = None
+        self.record_zones = None
+
+    @classmethod
+    def from_records(cls, records, catalog, site):
+        """
+        Method to compute the statistics of a layout from its trees in one pass
+
+        :param records (numpy array): TREE_RECORD records of the layout
+        :param catalog (SpeciesCatalog): catalog of tree type attributes
+        :param site (Site): site of the layout
+        :return: LayoutStatistics object
+        """
+        stats = cls(catalog, site)
+        zones = stats.zones[records["y"], records["x"]].astype(np.intp)
+        cells = zones * len(catalog) + records["species"]
+        stats.counts += np.bincount(cells, minlength=stats.counts.size).reshape(stats.counts.shape)
+        return stats
+
+    def copy(self):
+        """
+        Method to copy the counts of the statistics to change them, sharing the catalog and zone map. The copy is never exact.
+        :return: LayoutStatistics object
+        """
+        clone = LayoutStatistics.__new__(LayoutStatistics)
+        clone.catalog = self.catalog
+        clone.zones = self.zones
+        clone.counts = self.counts.copy()
+        clone.records = None
+        clone.record_zones = None
+        return clone
+
+    def exact(self, records):
+        """
+        Method to get statistics of the same layout whose float totals add up the values of the trees one by one in row by row
+        order, so they are bit for bit the same as a scan of the grid. The integer statistics still come from the counts.
+
+        :param records (numpy array): TREE_RECORD records of the layout, sorted row by row
+        :return: LayoutStatistics object sharing the counts
+        """
+        clone = LayoutStatistics.__new__(LayoutStatistics)
+        clone.catalog = self.catalog
+        clone.zones = self.zones
+        clone.counts = self.counts
+        clone.records = records
+        clone.record_zones = self.zones[records["y"], records["x"]]
+        return clone
+
+    def add(self, x, y, species):
+        """
+        Method to count a tree that was planted
+
+        :param x (int): x coordinate of the tree base
+        :param y (int): y coordinate of the tree base
+        :param species (int): tree type id
+        """
+        self.counts[self.zones[y, x], species] += 1
+
+    def remove(self, x, y, species):
+        """
+        Method to stop counting a tree that was removed
+
+        :param x (int): x coordinate of the tree base
+        :param y (int): y coordinate of the tree base
+        :param species (int): tree type id
+        """
+        self.counts[self.zones[y, x], species] -= 1
+
+    def adjust(self, zone, species, change):
+        """
+        Method to change the number of trees of a tree type counted in a zone, such as to try out a planting on a copy
+
+        :param zone (int): ZONE_ value
+        :param species (int): tree type id
+        :param change (int): number of trees to add, negative to remove
+        """
+        self.counts[zone, species] += change
+
+    def total(self, attribute, zone=None, mask=None):
+        """
+        Method to add up an integer attribute over the trees
+
+        :param attribute (numpy array): attribute of each tree type
+        :param zone (int): only count trees in this zone, all trees if not given
+        :param mask (numpy array): only count tree types in this boolean mask
+        :return: total as an int
+        """
+        counts = self.counts.sum(axis=0) if zone is None else self.counts[zone]
+        if mask is not None:
+            attribute = attribute * mask
+        return int(counts @ attribute)
+
+    def float_total(self, attribute, zone=None, mask=None):
+        """
+        Method to add up a float attribute over the trees. Exact statistics add the value of every tree in row by row order.
+        Otherwise the count of each tree type times its value is added from the first tree type to the last, which is quick
+        but can differ in the last bit from the exact total.
+
+        :param attribute (numpy array): float attribute of each tree type
+        :param zone (int): only count trees in this zone, all trees if not given
+        :param mask (numpy array): only count tree types in this boolean mask
+        :return: total as a float, or 0 if no tree was counted
+        """
+        if self.records is not None:
+            species = self.records["species"]
+            counted = np.ones(len(species), dtype=bool) if zone is None else self.record_zones == zone
+            if mask is not None:
+                counted &= mask[species]
+            return sequential_sum(attribute[species[counted]])
+        counts = self.counts.sum(axis=0) if zone is None else self.counts[zone]
+        if mask is not None:
+            counts = counts * mask
+        counted = np.flatnonzero(counts)
+        if not len(counted):
+            return 0
+        return np.cumsum(counts[counted] * attribute[counted])[-1].item()
+
+    @property
+    def total_trees(self):
+        return int(self.counts.sum())
+
+    @property
+    def total_cost(self):
+        return self.total(self.catalog.price)
+
+    @property
+    def total_co2(self):
+        return self.float_total(self.catalog.co2_absorption)
+
+    @property
+    def total_quantity_credit_evergreen(self):
+        return self.total(self.catalog.credit_value, mask=self.catalog.evergreen)
+
+    @property
+    def total_quantity_credit_deciduous(self):
+        return self.total(self.catalog.credit_value, mask=self.catalog.deciduous)
+
+    @property
+    def total_quantity_credit_native(self):
+        return self.total(self.catalog.credit_value, mask=self.catalog.native)
+
+    @property
+    def total_evergreen_trees(self):
+        return self.total(self.catalog.evergreen)
+
+    @property
+    def total_deciduous_trees(self):
+        return self.total(self.catalog.deciduous)
+
+    @property
+    def total_large_trees(self):
+        return self.total(self.catalog.large)
+
+    @property
+    def total_crown_area(self):
+        return self.float_total(self.catalog.crown_area)
+
+    @property
+    def total_crown_hedge(self):
+        return self.float_total(self.catalog.crown_area, ZONE_HEDGE)
+
+    @property
+    def num_trees_road(self):
+        return int(self.counts[ZONE_ROAD].sum())
+
+    @property
+    def num_trees_pedestrian(self):
+        return int(self.counts[ZONE_PEDESTRIAN].sum())
+
+    @property
+    def num_native_road(self):
+        return self.total(self.catalog.native, ZONE_ROAD)
+
+    @property
+    def total_native_road_interval(self):
+        return self.float_total(self.catalog.width, ZONE_ROAD, self.catalog.native)
+
+    @property
+    def total_pedestrian_road_interval(self):
+        return self.float_total(self.catalog.width, ZONE_PEDESTRIAN)
@@ -1,4 +1,6 @@
-from Environment.Grid import Grid
+from Environment.Site import Site
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Constraints.ConstraintEngine import Constraint, ConstraintEngine, road_interval
 class ScenarioTwoConstraints:
     """
     Class to evaluate the constraints of scenario two, maximising CO2 absorption in the appartment complex. This defines the fitness function
@@ -10,6 +12,8 @@ class ScenarioTwoConstraints:
         cost_limit (int): the cost limit of the scenario
         tree_types_dict (dict): dictionary of tree types
         generator (TreeGenerator): tree generator object
+        catalog (SpeciesCatalog): catalog of tree type attributes, indexed by tree type id
+        engine (ConstraintEngine): checks layouts against the constraints of the scenario
     """
 
     def __init__(self, grid_width, grid_height, cost_limit, tree_types_dict, generator):
@@ -26,7 +30,55 @@ class ScenarioTwoConstraints:
         self.cost_limit = cost_limit
         self.tree_types_dict = tree_types_dict
         self.generator = generator
-        self.planting_areas = Grid(grid_width, grid_height, 2)
+        self.catalog = SpeciesCatalog.load()
+        self.planting_areas = Site.load(2)
+        self.engine = ConstraintEngine(self.constraints(), lambda stats: stats.total_co2, -100, self.catalog)
+
+    def __getstate__(self):
+        #the constraints are lambdas, so the engine is built again when unpickled, such as in an evaluation worker
+        state = self.__dict__.copy()
+        del state["engine"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.engine = ConstraintEngine(self.constraints(), lambda stats: stats.total_co2, -100, self.catalog)
+
+    def constraints(self):
+        """
+        Method to define the constraints of the scenario as defined in the paper, in the order they are checked
+        :return: list of Constraint objects
+        """
+        return [
+            #tree ratio constraints
+            Constraint("min_evergreen_to_all", "min", lambda stats: stats.total_quantity_credit_evergreen,
+                       lambda stats: 0.2 * (stats.total_quantity_credit_evergreen + stats.total_quantity_credit_deciduous)),
+            Constraint("min_native_to_all", "min", lambda stats: stats.total_quantity_credit_native,
+                       lambda stats: 0.1 * (stats.total_quantity_credit_evergreen + stats.total_quantity_credit_deciduous)),
+            Constraint("min_large_to_all", "min", lambda stats: stats.total_large_trees,
+                       lambda stats: 0.06 * stats.total_trees),
+            Constraint("min_trees_to_landscape", "min",
+                       lambda stats: stats.total_quantity_credit_evergreen + stats.total_quantity_credit_deciduous,
+                       0.2 * (7326)), #7326 meters squared is plantable area of apartment complex
+            #canopy coverage constraints
+            Constraint("max_canopy_coverage", "max", lambda stats: stats.total_crown_area, 0.6 * (7326)),
+            Constraint("min_canopy_coverage", "min", lambda stats: stats.total_crown_area, 0.4 * (7326)),
+            #tree count constraints
+            Constraint("min_evergreen_count", "min", lambda stats: stats.total_evergreen_trees,
+                       lambda stats: 0.015 * (stats.total_evergreen_trees + stats.total_deciduous_trees)),
+            Constraint("min_deciduous_count", "min", lambda stats: stats.total_deciduous_trees,
+                       lambda stats: 0.015 * (stats.total_evergreen_trees + stats.total_deciduous_trees)),
+            #road side planting. meter length of road, keep 10 meter interval between
+            Constraint("road_side_planting", "min",
+                       lambda stats: road_interval(stats.num_native_road, stats.total_native_road_interval), 148),
+            #pedestrian road planting. meter length of pedestrian road
+            Constraint("pedestrian_road_planting", "min",
+                       lambda stats: road_interval(stats.num_trees_pedestrian, stats.total_pedestrian_road_interval), 186),
+            #hedge planting. meter length of hedge zone
+            Constraint("hedge_planting", "min", lambda stats: stats.total_crown_hedge, 360),
+            #cost constraint
+            Constraint("total_cost", "max", lambda stats: stats.total_cost, self.cost_limit),
+        ]
 
     def evaluate(self, individual):
         """
@@ -34,247 +86,28 @@ class ScenarioTwoConstraints:
         :param individual: chromosome to evaluate
         :return: int representing the fitness of the individual
         """
+        result = self.engine.check(individual.grid, exact=True)
+        if result.violation is not None:
+            print(result.violation)
+        return result.fitness,
 
-        #track cost and co2
-        total_cost = 0
-        total_co2 = 0
-        #flatten the grid
-        individual = individual.grid.numerical_grid.flatten()
-        grid = [individual[i:i+ self.GRID_WIDTH] for i in range(0, len(individual), self.GRID_WIDTH)]
-
-        #track tree statistics
-        total_quantity_credit_evergreen = 0
-        total_quantity_credit_deciduous = 0
-        total_quantity_credit_native = 0
-        total_trees = 0
-        total_evergreen_trees = 0
-        total_deciduous_trees = 0
-        total_large_trees = 0 #large trees are trees with radius >= 20
-        total_crown_area = 0
-        total_crown_hedge = 0
-        num_trees_road = 0
-        num_trees_pedestrian = 0
-        num_native_road = 0
-        total_native_road_interval = 0
-        total_pedestrian_road_interval = 0
-
-        #loop through grid and increment statistics
-        for y, row in enumerate(grid):
-            for x, cell in enumerate(row):
-                if cell > 0:
-                    tree = self.generator.generateTree(self.tree_types_dict[cell], (x, y))
-                    total_cost += tree.getPrice()
-                    total_co2 += tree.getCo2Absorption()
-                    leaf_type = tree.getLeafType()
-                    if leaf_type == "Evergreen":
-                        total_quantity_credit_evergreen += tree.getCreditValue()
-                        total_evergreen_trees += 1
-                    elif leaf_type == "Deciduous":
-                        total_quantity_credit_deciduous += tree.getCreditValue()
-                        total_deciduous_trees += 1
-                    if tree.getTreeCategory() == "Large":
-                        total_large_trees += 1
-                    elif tree.getTreeCategory() == "Native":
-                        total_quantity_credit_native += tree.getCreditValue()
-
-                    if self.planting_areas.grid[y][x].hedge: #check if square is hedge
-                        total_crown_hedge += tree.getCrownArea()
-                    elif self.planting_areas.grid[y][x].road: #check if square is road
-                        num_trees_road += 1
-                        if tree.getTreeCategory() == "Native":
-                            num_native_road += 1
-                            total_native_road_interval += tree.plant_size[1]
-                    elif self.planting_areas.grid[y][x].pedestrian_road: #check if square is pedestrian road
-                        num_trees_pedestrian += 1
-                        total_pedestrian_road_interval += tree.plant_size[1]
-
-                    total_trees += 1
-                    total_crown_area += tree.getCrownArea()
-
-        #constraints as defined in the paper
-        #############################
-        min_trees_to_landscape = 0.2 * (7326) #7326 meters squared is plantable area of apartment complex
-        min_evergreen_to_all = 0.2 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_native_to_all = 0.1 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_large_to_all = 0.06 * total_trees
-        max_canopy_coverage = 0.6 * (7326) #-1 because some regions not plantable
-        min_canopy_coverage = 0.4 * (7326) #-1 because some regions not plantable
-        min_evergreen_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        min_deciduous_count = 0.015 * (total_evergreen_trees + total_deciduous_trees)
-        #############################
-
-        #################TREE RATIO CONSTRAINTS################
-        if total_quantity_credit_evergreen + total_quantity_credit_deciduous < min_trees_to_landscape:
-            print("total_quantity_credit_evergreen")
-            return -100,
-        elif total_quantity_credit_evergreen < min_evergreen_to_all:
-            print("total_quantity_credit_evergreen")
-            return -100,
-        elif total_quantity_credit_native < min_native_to_all:
-            print("total_quantity_credit_native")
-            return -100,
-        elif total_large_trees < min_large_to_all:
-            print("total_large_trees")
-            return -100,
-
-        ################CANOPY COVERAGE CONSTRAINTS############
-        if total_crown_area > max_canopy_coverage:
-            print("total_crown_area above")
-            return -100,
-        elif total_crown_area < min_canopy_coverage:
-            print("total_crown_area below")
-            return -100,
-
-        ################TREE COUNT CONSTRAINTS################
-        if total_evergreen_trees < min_evergreen_count:
-            print("total_evergreen_trees")
-            return -100,
-        elif total_deciduous_trees < min_deciduous_count:
-            print("total_deciduous_trees")
-            return -100,
-        ############ROAD SIDE PLANTING################
-        if num_native_road * (total_native_road_interval / num_native_road) < 148: #meter length of road. keep 10 meter interval between. seems as though paper used 10 meters given 20 native trees planted
-            print("Not enough trees planted by road " + str(num_native_road * 2) + " < " + str(148))
-            return -100,
-        ############PEDESTRIAN ROAD PLANTING################
-        if num_trees_pedestrian * (total_pedestrian_road_interval / num_trees_pedestrian) < 186: #meter length of pedestrian road. multiple by 4 since the interva is set to 8 blocks (4 meters)
-            print("Not enough trees planted by pedestrian road " + str(num_trees_pedestrian * 2) + " < " + str(186))
-            return -100,
-        #############Hedge Planting################
-        if total_crown_hedge < 360: #meter length of hedge zone
-            print("hedge_planting")
-            return -100,
-        ################COST CONSTRAINTS################
-        if total_cost > self.cost_limit:
-            print("total_cost")
-            return -100,
-        return total_co2,
-
-    def validate(self, individual):
-        """`
-        Method to validate the constraints of the scenario. If a constraint is violated, the constraint is returned, otherwise, "VALID" is returned.
-        :param individual: chromosome to evaluate
-        :return: string representing the constraint violated or "VALID" if no constraints are violated
+    def validate(self, layout):
         """
-
-        #track cost and co2
-        total_cost = 0
-        total_co2 = 0
-        #flatten the grid
-        grid = [individual[i:i+ self.GRID_WIDTH] for i in range(0, len(individual), self.GRID_WIDTH)]
-
-        #track tree statistics
-        total_quantity_credit_evergreen = 0
-        total_quantity_credit_deciduous = 0
-        total_quantity_credit_native = 0
-        total_trees = 0
-        total_evergreen_trees = 0
-        total_deciduous_trees = 0
-        total_large_trees = 0 #large trees are trees with radius >= 20
-        total_crown_area = 0
-        total_crown_hedge = 0
-        num_trees_road = 0
-        num_trees_pedestrian = 0
-        num_native_road = 0
-        total_native_road_interval = 0
-        total_pedestrian_road_interval = 0
-
-        #loop through grid and increment statistics
-        for y, row in enumerate(grid):
-            for x, cell in enumerate(row):
-                if cell > 0: #only check base of tree
-                    tree = self.generator.generateTree(self.tree_types_dict[cell], (x, y))
-                    total_cost += tree.getPrice()
-                    total_co2 += tree.getCo2Absorption()
-                    leaf_type = tree.getLeafType()
-                    if leaf_type == "Evergreen":
-                        total_quantity_credit_evergreen += tree.getCreditValue()
-                        total_evergreen_trees += 1
-                    elif leaf_type == "Deciduous":
-                        total_quantity_credit_deciduous += tree.getCreditValue()
-                        total_deciduous_trees += 1
-                    if tree.getTreeCategory() == "Large":
-                        total_large_trees += 1
-                    elif tree.getTreeCategory() == "Native":
-                        total_quantity_credit_native += tree.getCreditValue()
-
-                    if self.planting_areas.grid[y][x].hedge: #check if square is hedge
-                        total_crown_hedge += tree.getCrownArea()
-                    elif self.planting_areas.grid[y][x].road: #check if square is road
-                        num_trees_road += 1
-                        if tree.getTreeCategory() == "Native":
-                            num_native_road += 1
-                            total_native_road_interval += tree.plant_size[1]
-                    elif self.planting_areas.grid[y][x].pedestrian_road: #check if square is pedestrian road
-                        num_trees_pedestrian += 1
-                        total_pedestrian_road_interval += tree.plant_size[1]
-
-                    total_trees += 1
-                    total_crown_area += tree.getCrownArea()
-
-        #constraints as defined in the paper
-        #############################
-        min_trees_to_landscape = 0.2 * (7326)
-        min_evergreen_to_all = 0.2 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_native_to_all = 0.1 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_large_to_all = 0.06 * total_trees
-        max_canopy_coverage = 0.6 * (7326) #-1 because some regions not plantable
-        min_canopy_coverage = 0.4 * (7326) #-1 because some regions not plantable
-        min_evergreen_count = 0.015 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        min_deciduous_count = 0.015 * (total_quantity_credit_evergreen + total_quantity_credit_deciduous)
-        #############################
-
-        #############TREE RATIO CONSTRAINTS################
-        if total_quantity_credit_evergreen < min_evergreen_to_all:
-            #print("Not enough evergreen trees to all trees " + str(total_quantity_credit_evergreen) + " < " +  str(min_evergreen_to_all))
-            return "min_evergreen_to_all"
-        elif total_quantity_credit_native < min_native_to_all:
-            #print("Not enough native trees to all trees " + str(total_quantity_credit_native) + " < "  + str(min_native_to_all))
-            return "min_native_to_all"
-        elif total_large_trees < min_large_to_all:
-            #print("Not enough large trees to all trees " + str(total_large_trees) + " < " + str(min_large_to_all))
-            return "min_large_to_all"
-        elif total_quantity_credit_evergreen + total_quantity_credit_deciduous < min_trees_to_landscape:
-            #print("Not enough trees to landscape " + str(total_quantity_credit_evergreen) + " + " + str(total_quantity_credit_deciduous) + " < " + str(min_trees_to_landscape))
-            return "min_trees_to_landscape"
-        ############CANOPY COVERAGE CONSTRAINTS############
-        if total_crown_area > max_canopy_coverage:
-            print("Canopy coverage exceeds " + str(max_canopy_coverage) + " at " + str(total_crown_area))
-            return "max_canopy_coverage"
-        elif total_crown_area < min_canopy_coverage:
-            #print("Canopy coverage below " + str(total_crown_area))
-            return "min_canopy_coverage"
-        ############TREE COUNT CONSTRAINTS################
-        if total_evergreen_trees < min_evergreen_count:
-            #print("Not enough evergreen trees " + str(total_evergreen_trees) + " < " + str(min_evergreen_count))
-            return "min_evergreen_count"
-        elif total_deciduous_trees < min_deciduous_count:
-            #print("Not enough deciduous trees " + str(total_deciduous_trees) + " < " + str(min_deciduous_count))
-            return "min_deciduous_count"
-        ############ROAD SIDE PLANTING################
-        if num_native_road * (total_native_road_interval / num_native_road) < 148: #meter length of road. keep 10 meter interval between. seems as though paper used 10 meters given 20 native trees planted
-            #print("Not enough trees planted by road " + str(num_native_road * 2) + " < " + str(148))
-            return "road_side_planting"
-        ############PEDESTRIAN ROAD PLANTING################
-        if num_trees_pedestrian * (total_pedestrian_road_interval / num_trees_pedestrian) < 186: #meter length of pedestrian road. multiple by 4 since the interva is set to 8 blocks (4 meters)
-            print("Not enough trees planted by pedestrian road " + str(num_trees_pedestrian * (total_pedestrian_road_interval / num_trees_pedestrian)) + " < " + str(186))
-            return "pedestrian_road_planting"
-        #############Hedge Planting################
-        if total_crown_hedge < 360: #meter length of hedge zone
-            #print("Not enough trees planted by hedge " + str(total_crown_hedge) + " < " + str(0.1 * total_crown_area))
-            return "hedge_planting"
-        ############COST CONSTRAINTS################
-        if total_cost > self.cost_limit:
-            #print("Cost exceeds " + str(total_cost))
-            return "total_cost"
-
+        Method to validate the constraints of the scenario. If a constraint is violated, the constraint is returned, otherwise, "VALID" is printed.
+        :param layout (Grid): grid holding the trees to validate
+        :return: string representing the constraint violated, or None if no constraints are violated
+        """
+        result = self.engine.check(layout, exact=True)
+        if result.violation is not None:
+            return result.violation
 
         #############VALID################
+        stats, bounds = result.stats, result.bounds
         print("VALID --- STATISTICS")
-        print("Total CO2 Intake: " + str(total_co2))
-        print("Trees to landscape - " + str(total_quantity_credit_evergreen) + " + " + str(total_quantity_credit_deciduous) + " > " + str(min_trees_to_landscape))
-        print("Evergreen to all - " + str(total_quantity_credit_evergreen) + " > " +  str(min_evergreen_to_all))
-        print("Native to all - " + str(total_quantity_credit_native) + " > "  + str(min_native_to_all))
-        print("Large to all - " + str(total_large_trees) + " > " + str(min_large_to_all))
-        print("Canopy coverage - " + str(total_crown_area) + " < " + str(max_canopy_coverage) + " and > " + str(min_canopy_coverage))
-        print("Cost - " + str(total_cost) + " < " + str(self.cost_limit))
+        print("Total CO2 Intake: " + str(stats.total_co2))
+        print("Trees to landscape - " + str(stats.total_quantity_credit_evergreen) + " + " + str(stats.total_quantity_credit_deciduous) + " > " + str(bounds["min_trees_to_landscape"]))
+        print("Evergreen to all - " + str(stats.total_quantity_credit_evergreen) + " > " +  str(bounds["min_evergreen_to_all"]))
+        print("Native to all - " + str(stats.total_quantity_credit_native) + " > "  + str(bounds["min_native_to_all"]))
+        print("Large to all - " + str(stats.total_large_trees) + " > " + str(bounds["min_large_to_all"]))
+        print("Canopy coverage - " + str(stats.total_crown_area) + " < " + str(bounds["max_canopy_coverage"]) + " and > " + str(bounds["min_canopy_coverage"]))
+        print("Cost - " + str(stats.total_cost) + " < " + str(self.cost_limit))
@@ -0,0 +1,100 @@
+import weakref
+import numpy as np
+from Trees.TreeFootprint import TreeFootprint
+
+
+class FeasibilityIndex:
+    """
+    FeasibilityIndex class answering where a tree of a given radius fits on a grid. For every radius asked about it keeps a 2D
+    boolean map of the tree bases whose whole footprint is plantable and free, found by eroding the unoccupied squares with
+    the footprint disk and keeping the bases the static map of the site allows. Writes to the numerical grid only mark the squares they touch, and the maps are brought up to date around
+    those squares on the next query, so keeping the index costs about as much as the writes did.
+
+    Attributes:
+        grid (Grid): weak proxy of the grid being indexed. The grid holds the index, so a strong reference back would make a
+        cycle that keeps the grid, and its arena slot, alive until the cyclic garbage collector runs
+        maps (dict): radius -> 2D boolean numpy array, true where a tree of that radius fits with its base on the square
+        dirty (list): (first row, last row, first column, last column) boxes of squares written since the maps were updated
+    """
+
+    def __init__(self, grid):
+        """
+        Constructor for the FeasibilityIndex class
+
+        :param grid (Grid): grid to index
+        """
+        self.grid = weakref.proxy(grid)
+        self.maps = {}
+        self.dirty = []
+
+    def mark(self, rows, cols):
+        """
+        Method to mark squares of the numerical grid as written, so the maps are updated around them on the next query
+
+        :param rows (numpy array): y coordinates of the squares
+        :param cols (numpy array): x coordinates of the squares
+        """
+        if self.maps and len(rows):
+            self.dirty.append((int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max())))
+
+    def fits(self, radius):
+        """
+        Method to get the map of the tree bases a tree of a radius fits on, building it on first use
+
+        :param radius (int): footprint radius of the tree, in squares
+        :return: 2D boolean numpy array, true where the tree fits
+        """
+        self.refresh()
+        if radius not in self.maps:
+            self.maps[radius] = self.erode(radius, 0, self.grid.y - 1, 0, self.grid.x - 1)
+        return self.maps[radius]
+
+    def refresh(self):
+        """
+        Method to update the maps around every box of squares written since the last query. Only the bases whose footprint
+        reaches into a box can have changed.
+        """
+        for top, bottom, left, right in self.dirty:
+            for radius, fits in self.maps.items():
+                box = (max(0, top - radius), min(self.grid.y - 1, bottom + radius),
+                       max(0, left - radius), min(self.grid.x - 1, right + radius))
+                fits[box[0]:box[1] + 1, box[2]:box[3] + 1] = self.erode(radius, *box)
+        self.dirty.clear()
+
+    def erode(self, radius, top, bottom, left, right):
+        """
+        Method to find the bases in a box where a tree of a radius fits. The free squares are eroded in a window reaching one
+        radius past the box, and the result is combined with the static map of the site, which already accounts for the
+        squares that are not plantable.
+
+        :param radius (int): footprint radius of the tree, in squares
+        :param top (int): first row of the box
+        :param bottom (int): last row of the box
+        :param left (int): first column of the box
+        :param right (int): last column of the box
+        :return: 2D boolean numpy array of the box
+        """
+        rows = slice(max(0, top - radius), min(self.grid.y, bottom + radius + 1))
+        cols = slice(max(0, left - radius), min(self.grid.x, right + radius + 1))
+        fits = TreeFootprint.erode(self.grid.numerical_grid[rows, cols] == 0, radius)
+        box = (slice(top - rows.start, bottom - rows.start + 1), slice(left - cols.start, right - cols.start + 1))
+        return fits[box] & self.grid.site.fit_map(radius)[top:bottom + 1, left:right + 1]
+
+    def nearest(self, radius, x, y, reach):
+        """
+        Method to find the nearest base to a square where a tree of a radius fits. Ties are broken row by row.
+
+        :param radius (int): footprint radius of the tree, in squares
+        :param x (int): x coordinate of the square
+        :param y (int): y coordinate of the square
+        :param reach (int): largest distance from the square searched, in squares
+        :return: (x, y) coordinates of the base, or None if the tree fits nowhere within reach
+        """
+        top, left = max(0, y - reach), max(0, x - reach)
+        rows, cols = np.nonzero(self.fits(radius)[top:y + reach + 1, left:x + reach + 1])
+        distances = (rows + top - y)**2 + (cols + left - x)**2
+        within = np.flatnonzero(distances <= reach**2)
+        if not len(within):
+            return None
+        nearest = within[np.argmin(distances[within])]
+        return int(cols[nearest] + left), int(rows[nearest] + top)
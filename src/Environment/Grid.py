@@ -1,209 +1,196 @@
 import numpy as np
-import json
-from Landscape.Square import Square
+from Constraints.LayoutStatistics import LayoutStatistics
+from Environment.FeasibilityIndex import FeasibilityIndex
+from Environment.LayoutTransaction import LayoutTransaction
+from Environment.Site import Site
+from Landscape.Square import SquareGrid
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Trees.Tree import Tree
+from Trees.TreeFootprint import TreeFootprint
+
+#record of one planted tree in the sparse chromosome: coordinates of the tree base and the tree type id
+TREE_RECORD = np.dtype([("x", np.int16), ("y", np.int16), ("species", np.int8)])
+
+#keys of the layout hash are kept to 64 bits
+MASK_64 = (1 << 64) - 1
+
+
+def zobrist_key(x, y, species, width):
+    """
+    Method to get the random 64 bit key of a tree type planted on a square, used to hash layouts Zobrist style. The key is
+    mixed from the square and tree type with splitmix64 rather than read from a table, so no table of every square and tree
+    type has to be kept and the keys are the same in every process.
+
+    :param x (int): x coordinate of the tree base
+    :param y (int): y coordinate of the tree base
+    :param species (int): tree type id
+    :param width (int): x size of the grid
+    :return: key as an int
+    """
+    z = ((y * width + x) * 128 + species + 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
 
 class Grid:
     """
-    Grid class to handle initalisation of the grid and planting of trees. The grid is a 2D array of Square objects. The numerical
-    grid is a 2D array of integers that represents the grid planting state, which is used for the genetic algorithm as the chromosome/individual.
+    Grid class to handle initalisation of the grid and planting of trees. The static zone layers (plantable, road, hedge, big tree
+    area, pedestrian road) are shared through the Site object and never change. The chromosome/individual used by the genetic
+    algorithm is the sparse trees dictionary of tree base -> tree type id, exported as an array of TREE_RECORD records. The numerical
+    grid, a 2D array of integers where every square of a tree footprint holds the negative tree type id and the tree base holds the
+    positive one, is derived from the trees only when it is first needed for collision checks or rendering.
 
     Attributes:
         x (int): x size of the grid
         y (int): y size of the grid
         landscape_area (int): total area of the landscape
-        grid (numpy array): 2D array of Square objects
-        numerical_grid (numpy array): 2D array of integers that represents the grid planting state
+        site (Site): shared static layers of the environment
+        grid (SquareGrid): 2D view of Square objects over the layers
+        numerical_grid (numpy array): 2D int8 array that represents the grid planting state, derived lazily
+        arena (PopulationArena): optional shared store the numerical grid is kept in
+        trees (dict): (x, y) coordinates of a tree base -> tree type id planted there
+        stats (LayoutStatistics): running tree statistics of the trees, updated on every plant and unplant
+        layout_hash (int): Zobrist hash of the trees, the XOR of the zobrist_key of every tree, updated on every plant and unplant
+        transaction (LayoutTransaction): transaction recording the edits to the grid, or None
+        shared (bool): true while the trees, statistics and numerical grid may be shared with copies of the grid
+        feasibility (FeasibilityIndex): index of where each tree radius fits on the numerical grid, built lazily
     """
 
+    #attributes of every tree type, indexed by tree type id
+    catalog = SpeciesCatalog.load()
+
+    #largest footprint radius of any tree species, in squares
+    MAX_TREE_RADIUS = int(catalog.radius.max())
+
     # define a dictionary of tree types of number -> tree type
-    tree_types_dict = {
-        0: "None",
-        1: "Abies Holophylla",
-        2: "Pinus Desniflora1",
-        3: "Pinus Desniflora2",
-        4: "Pinus Desniflora Globosa",
-        5: "Taxus Cuspidata",
-        6: "White Pine",
-        7: "Acer Palmatum",
-        8: "Betula Platyphylla",
-        9: "Cercidiphyllum Japonicum",
-        10: "Chaenomeless Sinensis",
-        11: "Chionanthus Retusus",
-        12: "Cornus Officinalis",
-        13: "Ginkgo Biloba",
-        14: "Kobus Magnolia",
-        15: "Liriodendron Tulipifera",
-        16: "Oak",
-        17: "Persimmon",
-        18: "Prunus Armeniaca",
-        19: "Prunus Yedoensis",
-        20: "Sophora Japonica",
-        21: "Zelkova Serrata"
-    }
-
-    def __init__(self, x, y, scenario):
+    tree_types_dict = catalog.types_dict()
+
+    def __init__(self, x, y, scenario, arena=None):
         """
         Constructor for the Grid class
 
         :param x (int): x size of the grid
         :param y (int): y size of the grid
         :param scenario (int): scenario number
+        :param arena (PopulationArena): optional shared store to keep the numerical grid in
         """
         self.x = x
         self.y = y
         self.landscape_area = x * y
-        if scenario == 1 or scenario == 2:
-            #create apartment grid
-            with open("Environment/apartment_grid.json", "r") as f:
-                self.apartment_grid = np.array(json.load(f))
-            self.grid = self.create_grid_apartment(x, y)
-        elif scenario == 3:
-            # create edinburgh grid
-            with open("Environment/park_grid.json", "r") as f:
-                self.park_grid = np.array(json.load(f))
-            self.grid = self.create_grid_edinburgh(x, y)
-        # create numerical grid (chromosome/individual)
-        self.numerical_grid = self.create_numerical_grid(x, y)
-
-    def create_grid_apartment(self, x, y):
-        """
-        Method to create a grid of Square objects
-        :param x (int): x size of the grid
-        :param y (int): y size of the grid
-        :return: the numpy grid of square objects
-        """
-        grid = np.empty((y, x), dtype=object)  # Swap x and y here
-        for i in range(y): #loop through rows (height)
-            for j in range(x): #loop through columns (width)
-                if self.apartment_grid[i, j] == 101 and ((j > 316 and j < 320) or i < 22): #yellow grayscale value
-                    grid[i, j] = Square(j, i, False, True, True, False, False)
-                elif self.apartment_grid[i, j] == 63: #red grayscale value
-                    grid[i, j] = Square(j, i, False, True, False, True, False)
-                elif self.apartment_grid[i, j] == 77: #green grayscale value
-                    grid[i, j] = Square(j, i, True, True, False, False, False)
-                elif self.apartment_grid[i, j] == 101: #blue grayscale value
-                    grid[i, j] = Square(j, i, False, True, False, False, False)
-                elif self.apartment_grid[i, j] == 168: #orange grayscale value
-                    grid[i, j] = Square(j, i, False, True, False, False, True)
-                else: #non plantable area
-                    grid[i, j] = Square(j, i, False, False, False, False, False)
-
-        #hard coding problem cells
-        #(161, 63)     (166, 63)
-        #(161, 107)     (166, 107)
-        #loop between these coordinates and set square to be by pedestrian_road
-        for i in range(63, 108): #fixing pedestiran road that is not set
-            for j in range(161, 165):
-                grid[i, j].pedestrian_road = True
-
-        #(167, 101)     (274, 101)
-        #(167, 106)     (274, 106)
-        #loop between these coordinates and set square to be by plantable
-        for i in range(101, 107):
-            for j in range(167, 275):
-                grid[i, j].plantable = True
-
-        #(75, 142)      (77, 142)
-        #(75, 189)      (77, 189)
-        for i in range(142, 190):
-            for j in range(75, 78):
-                grid[i, j].plantable = True
-
-        #(40, 254)     (141, 254)
-        #(40, 259)     (141, 259)
-        for i in range(254, 260):
-            for j in range(40, 142):
-                grid[i, j].plantable = True
-
-        #(167, 393)    (170, 393)
-        #(167, 427)    (170, 427)
-        for i in range(393, 428):
-            for j in range(167, 171):
-                grid[i, j].plantable = True
-
-        #(170, 427)    (314, 427)
-        #(170, 432)    (314, 432)
-        for i in range(427, 433):
-            for j in range(170, 315):
-                grid[i, j].plantable = True
-
-        #(162, 279)   (167, 279)
-        #(162, 324)   (167, 324)
-        for i in range(279, 325):
-            for j in range(162, 166):
-                grid[i, j].pedestrian_road = True
-
-        #(167, 319)   (314, 319)
-        #(167, 323)   (314, 323)
-        for i in range(319, 324):
-            for j in range(167, 315):
-                grid[i, j].plantable = True
-
-
-        #(318, 21)   (324, 21)
-        #(318, 438)   (324, 438)
-       # for i in range(21, 439):
-       #     for j in range(318, 320):
-       #         grid[i, j].hedge = True
-
-        #(162, 171(  (162, 215)
-        #(166, 171)   (166, 215)
-        for i in range(171, 216):
-            for j in range(162, 167):
-                grid[i, j].pedestrian_road = True
-
-
-        #(145, 217)    (145, 258)
-        #(149, 217)    (149, 258)
-        for i in range(217, 259):
-            for j in range(145, 150):
-                grid[i, j].pedestrian_road = True
-
-        #fill in the gaps by checking if the surrounding squares are of certain type and fill in the square as that type
-
-        for i in range(3, self.y-3):
-            for j in range(3, self.x-3):
-                if not grid[i, j].road and (grid[i-1, j].road and grid[i+1, j].road and grid[i, j-1].road and grid[i, j+1].road) or (grid[i-2, j].road and grid[i+2, j].road and grid[i, j-2].road and grid[i, j+2].road):
-                    grid[i, j].road = True
-
-        for i in range(3, self.y-3):
-            for j in range(3, self.x-3):
-                if not grid[i, j].pedestrian_road and (grid[i-1, j].pedestrian_road and grid[i+1, j].pedestrian_road and grid[i, j-1].pedestrian_road and grid[i, j+1].pedestrian_road) or (grid[i-2, j].pedestrian_road and grid[i+2, j].pedestrian_road and grid[i, j-2].pedestrian_road and grid[i, j+2].pedestrian_road):
-                    grid[i, j].pedestrian_road = True
-
-        for i in range(3, self.y-3):
-            for j in range(3, self.x-3):
-                if not grid[i, j].hedge and grid[i-1, j].hedge and grid[i+1, j].hedge and grid[i, j-1].hedge and grid[i, j+1].hedge:
-                    grid[i, j].hedge = True
-
-        for i in range(3, self.y-3):
-            for j in range(3, self.x-3):
-                if not grid[i, j].big_tree_area and grid[i-1, j].big_tree_area and grid[i+1, j].big_tree_area and grid[i, j-1].big_tree_area and grid[i, j+1].big_tree_area:
-                    grid[i, j].big_tree_area = True
-
-        for i in range(3, self.y-3):
-            for j in range(3, self.x-3):
-                if not grid[i, j].plantable and (grid[i-1, j].plantable and grid[i+1, j].plantable and grid[i, j-1].plantable and grid[i, j+1].plantable) or (grid[i-2, j].plantable and grid[i+2, j].plantable and grid[i, j-2].plantable and grid[i, j+2].plantable):
-                    grid[i, j].plantable = True
-
-        return grid
-
-    def create_grid_edinburgh(self, x, y):
-        """
-       Method to create a grid of Square objects
-       :param x (int): x size of the grid
-       :param y (int): y size of the grid
-       :return: the numpy grid of Square objects
-       """
-        grid = np.empty((y, x), dtype=object)  # Swap x and y here
-        for i in range(y):
-            for j in range(x):
-                #if 255, then not plantable
-                if self.park_grid[i, j] == 255:
-                    grid[i, j] = Square(j, i, False, False, False, False, False)
-                else:
-                    grid[i, j] = Square(j, i, False, True, False, False, False)
-        return grid
+        #static layers are compiled once and shared by every grid of the same site
+        self.site = Site.load(scenario)
+        #trees planted on the grid (chromosome/individual), keyed by the (x, y) coordinates of their base
+        self.trees = {}
+        self.stats = LayoutStatistics(self.catalog, self.site)
+        self.layout_hash = 0
+        #transaction recording the edits to the grid, if one is open
+        self.transaction = None
+        #numerical grid derived from the trees, None until it is first needed. with an arena it is a view into an arena slot
+        self.arena = arena
+        self._numerical_grid = None
+        self._release_slot = None
+        self._feasibility = None
+        #copy on write: while shared, the trees, statistics and numerical grid are copied before the first change
+        self.shared = False
+
+    def __deepcopy__(self, memo):
+        """
+        Copying a grid is copy on write. The copy shares the trees, statistics and numerical grid of the original, and whichever
+        of the two changes first takes its own copy of them, so cloning an individual that is never changed copies nothing. A
+        numerical grid kept in an arena slot is not shared, as the slot is handed back when the original is dropped, so the
+        copy derives its own from the trees if it is ever needed.
+        """
+        clone = Grid.__new__(Grid)
+        clone.__dict__.update(self.__dict__)
+        clone.transaction = None
+        clone._release_slot = None
+        clone._feasibility = None
+        if self._release_slot is not None:
+            clone._numerical_grid = None
+        self.shared = clone.shared = True
+        return clone
+
+    def __getstate__(self):
+        #only the trees and the site travel when pickled, the numerical grid and statistics are derived again on the other side
+        state = self.__dict__.copy()
+        state.update(arena=None, _numerical_grid=None, _release_slot=None, _feasibility=None, transaction=None, shared=False)
+        del state["stats"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.stats = LayoutStatistics.from_records(self.records(), self.catalog, self.site)
+
+    @property
+    def numerical_grid(self):
+        """
+        2D array of integers that represents the grid planting state, derived from the trees on first access. The array is
+        written in place by TreeSpacing, so a grid shared with its copies takes its own copy before returning it.
+        """
+        if self.shared:
+            self.unshare()
+        if self._numerical_grid is None:
+            self.rasterize(self.allocate_numerical_grid())
+        return self._numerical_grid
+
+    @numerical_grid.setter
+    def numerical_grid(self, numerical_grid):
+        self._feasibility = None
+        if self._release_slot is not None and numerical_grid is not self._numerical_grid:
+            self._numerical_grid[...] = numerical_grid #keep the grid in its arena slot
+        else:
+            self._numerical_grid = numerical_grid
+
+    def allocate_numerical_grid(self):
+        """
+        Method to set up empty storage for the numerical grid, in an arena slot if one is free
+        :return: the cleared numerical numpy grid
+        """
+        self.release_numerical_grid()
+        if self.arena is not None:
+            self._numerical_grid, self._release_slot = self.arena.acquire(self)
+        if self._numerical_grid is None:
+            self._numerical_grid = self.create_numerical_grid(self.x, self.y)
+        return self._numerical_grid
+
+    def release_numerical_grid(self):
+        """
+        Method to drop the numerical grid, handing its arena slot back. It is derived again from the trees on next access.
+        """
+        if self._release_slot is not None:
+            self._release_slot()
+        self._numerical_grid = None
+        self._release_slot = None
+        self._feasibility = None
+
+    def unshare(self):
+        """
+        Method to give a grid its own copy of the trees, statistics and numerical grid it shares with copies of it, before they
+        are changed
+        """
+        self.shared = False
+        self.trees = dict(self.trees)
+        self.stats = self.stats.copy()
+        if self._numerical_grid is not None and self._release_slot is None:
+            numerical_grid = self._numerical_grid
+            self.allocate_numerical_grid()[...] = numerical_grid
+
+    @property
+    def feasibility(self):
+        """
+        Index of where each tree radius fits on the numerical grid, created on first access and kept up to date by log_cells
+        """
+        if self._feasibility is None:
+            self._feasibility = FeasibilityIndex(self)
+        return self._feasibility
+
+    @property
+    def grid(self):
+        """
+        2D view of Square objects over the grid, for callers that index grid[y][x]. The squares are created on access.
+        """
+        return SquareGrid(self)
 
     def create_numerical_grid(self, x, y):
         """
@@ -212,23 +199,203 @@ class Grid:
         :param y (int): y size of the grid
         :return: the numerical numpy grid
         """
-        numerical_grid = np.empty((y, x), dtype=int)
-        for i in range(y):
-            for j in range(x):
-                numerical_grid[i, j] = 0
+        return np.zeros((y, x), dtype=np.int8) #tree type ids fit in a byte
+
+    def rasterize(self, numerical_grid=None):
+        """
+        Method to derive the numerical grid from the trees. Every square of a tree footprint is set to the negative tree type
+        id and the tree base to the positive one.
+        :param numerical_grid (numpy array): cleared grid to draw into, a new one is created if not given
+        :return: the numerical numpy grid
+        """
+        if numerical_grid is None:
+            numerical_grid = self.create_numerical_grid(self.x, self.y)
+        for (x, y), species in self.trees.items():
+            numerical_grid[self.footprint(x, y, species)] = -species
+            numerical_grid[y, x] = species
         return numerical_grid
 
+    def records(self):
+        """
+        Method to export the trees as an array of TREE_RECORD records, sorted row by row in the same order as a scan of the
+        numerical grid
+        :return: numpy array of TREE_RECORD
+        """
+        records = np.array([(x, y, species) for (x, y), species in self.trees.items()], dtype=TREE_RECORD)
+        return records[np.lexsort((records["x"], records["y"]))]
+
+    def load_records(self, records):
+        """
+        Method to replace the trees with an array of TREE_RECORD records. The records are trusted to come from a valid layout,
+        so no spacing checks are made. Records of the None tree type are not trees and are left out.
+        :param records (numpy array): array of TREE_RECORD records
+        """
+        records = records[records["species"] != 0]
+        self.trees = {(int(x), int(y)): int(species) for x, y, species in zip(records["x"], records["y"], records["species"])}
+        self.shared = False
+        self.stats = LayoutStatistics.from_records(records, self.catalog, self.site)
+        self.layout_hash = self.hash_trees()
+        self.release_numerical_grid()
+
+    def add_records(self, records):
+        """
+        Method to plant the trees of an array of TREE_RECORD records next to the trees already planted. The records are trusted
+        to fit, so no spacing checks are made. Their footprints are drawn in the numerical grid if it has been derived. Records
+        of the None tree type are not trees and are left out.
+        :param records (numpy array): array of TREE_RECORD records
+        """
+        for x, y, species in records[records["species"] != 0].tolist():
+            self.place(x, y, species)
+            if self._numerical_grid is not None:
+                rows, cols = self.footprint(x, y, species)
+                self.log_cells(rows, cols)
+                self._numerical_grid[rows, cols] = -species
+                self._numerical_grid[y, x] = species
+
+    def load_raster(self, numerical_grid):
+        """
+        Method to replace the trees with the ones in a numerical grid, such as a saved best grid
+        :param numerical_grid (numpy array): 2D array where tree bases hold the positive tree type id
+        """
+        ys, xs = np.nonzero(np.asarray(numerical_grid) > 0)
+        self.trees = {(int(x), int(y)): int(numerical_grid[y][x]) for y, x in zip(ys, xs)}
+        self.shared = False
+        self.stats = LayoutStatistics.from_records(self.records(), self.catalog, self.site)
+        self.layout_hash = self.hash_trees()
+        self.release_numerical_grid()
+
     def plant(self, x, y, tree):
         """
-        Method to plant a tree on a square
+        Method to record a tree as planted on a square and count it in the statistics and layout hash. The footprint itself is
+        written to the numerical grid by TreeSpacing.
         :param x: x coordinate
         :param y: y coordinate
         :param tree: tree object to plant
         :return: the grid with updated tree planted
         """
-        self.grid[y, x].plant(tree)
+        if self.site.plantable[y, x]:
+            self.place(*tree.getPlantingLocation(), tree.getNumericalRepresentation())
         return self.grid
 
+    def place(self, x, y, species):
+        """
+        Method to record a tree type as planted with its base on a square, replacing any tree already based there. The None
+        tree type, id 0, covers no squares and is not a tree, so placing it does nothing.
+        :param x: x coordinate of the tree base
+        :param y: y coordinate of the tree base
+        :param species: tree type id
+        """
+        if species == 0:
+            return
+        if self.shared:
+            self.unshare()
+        self.unplant(x, y)
+        if self.transaction is not None:
+            self.transaction.log_tree((x, y), None)
+        self.trees[(x, y)] = species
+        self.stats.add(x, y, species)
+        self.layout_hash ^= zobrist_key(x, y, species, self.x)
+
+    def unplant(self, x, y):
+        """
+        Method to forget the tree whose base is on a square, if there is one, and stop counting it in the statistics and layout hash
+        :param x: x coordinate
+        :param y: y coordinate
+        """
+        if self.shared:
+            self.unshare()
+        species = self.trees.pop((x, y), None)
+        if species is not None:
+            if self.transaction is not None:
+                self.transaction.log_tree((x, y), species)
+            self.stats.remove(x, y, species)
+            self.layout_hash ^= zobrist_key(x, y, species, self.x)
+
+    def transact(self):
+        """
+        Method to start a transaction that records the edits made to the grid in place so they can be rolled back
+        :return: LayoutTransaction object, to use as a context manager
+        """
+        return LayoutTransaction(self)
+
+    def log_cells(self, rows, cols):
+        """
+        Method to save the squares of the numerical grid that are about to be written, if a transaction is recording, and
+        mark them as written in the feasibility index
+        :param rows: y coordinates of the squares
+        :param cols: x coordinates of the squares
+        """
+        if self.transaction is not None:
+            self.transaction.log_cells(rows, cols)
+        if self._feasibility is not None:
+            self._feasibility.mark(rows, cols)
+
+    def hash_trees(self):
+        """
+        Method to compute the Zobrist hash of the trees from scratch. Grids holding the same trees have the same hash, however
+        they were planted.
+        :return: hash as an int
+        """
+        layout_hash = 0
+        for (x, y), species in self.trees.items():
+            layout_hash ^= zobrist_key(x, y, species, self.x)
+        return layout_hash
+
+    def tree_at(self, x, y):
+        """
+        Method to find the tree covering a square. Footprints never overlap, so the tree is the one whose base is within its
+        radius of the square.
+        :param x: x coordinate
+        :param y: y coordinate
+        :return: (x, y) coordinates of the base of the tree covering the square, or None if the square is free
+        """
+        if self.numerical_grid[y, x] == 0:
+            return None
+        for i in range(y - self.MAX_TREE_RADIUS, y + self.MAX_TREE_RADIUS + 1):
+            for j in range(x - self.MAX_TREE_RADIUS, x + self.MAX_TREE_RADIUS + 1):
+                species = self.trees.get((j, i))
+                if species is not None:
+                    radius = self.tree_radius(species)
+                    if (i - y)**2 + (j - x)**2 <= radius**2:
+                        return j, i
+        return None
+
+    def make_tree(self, x, y):
+        """
+        Method to build the Tree object for the tree whose base is on a square
+        :param x: x coordinate of the tree base
+        :param y: y coordinate of the tree base
+        :return: Tree object
+        """
+        return Tree(self.trees[(x, y)], (x, y))
+
+    def tree_radius(self, species):
+        """
+        Method to get the footprint radius of a tree type, in squares
+        :param species: tree type id
+        :return: radius of the tree footprint
+        """
+        return self.catalog.radius[species].item()
+
+    def footprint(self, x, y, species):
+        """
+        Method to get the squares covered by a tree, clipped to the site
+        :param x: x coordinate of the tree base
+        :param y: y coordinate of the tree base
+        :param species: tree type id
+        :return: (rows, columns) index arrays of the covered squares
+        """
+        return TreeFootprint.footprint(self.tree_radius(species), (x, y), self.site.x, self.site.y)
+
+    def is_free(self, x, y):
+        """
+        Method to check if a square is plantable and not covered by a tree
+        :param x: x coordinate
+        :param y: y coordinate
+        :return: true if a tree could cover the square, false otherwise
+        """
+        return bool(self.site.plantable[y, x]) and self.numerical_grid[y, x] == 0
+
     def print_grid(self):
         """
         Method to print the grid
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import numpy as np
+from PIL import Image
+from Environment.Site import ENVIRONMENT_DIR, Site
+
+
+def block_majority(gray, block_size):
+    """
+    Method to reduce a grayscale array to the majority value of each block_size x block_size block. Blocks cut off at the right
+    and bottom edges are dropped. Ties go to the smallest grayscale value, the same as scipy.stats.mode. The values of each
+    block are sorted and the longest run of equal values is its majority, so the memory used is a few bytes per pixel.
+
+    :param gray (numpy array): 2D array of grayscale values between 0 and 255
+    :param block_size (int): width and height of a block in pixels
+    :return: 2D uint8 array with one cell per block
+    """
+    rows = gray.shape[0] // block_size
+    cols = gray.shape[1] // block_size
+    pixels = block_size * block_size
+    blocks = np.asarray(gray[:rows * block_size, :cols * block_size], dtype=np.uint8)
+    blocks = blocks.reshape(rows, block_size, cols, block_size).transpose(0, 2, 1, 3).reshape(rows * cols, pixels)
+    blocks = np.sort(blocks, axis=1)
+    #length of the run of equal values up to each pixel, which is longest at the last pixel of the longest run, and the
+    #first longest run is the one of the smallest value
+    position = np.arange(pixels, dtype=np.int32)
+    starts = np.ones(blocks.shape, dtype=bool)
+    starts[:, 1:] = blocks[:, 1:] != blocks[:, :-1]
+    run_lengths = position - np.maximum.accumulate(np.where(starts, position, 0), axis=1)
+    majority = run_lengths.argmax(axis=1)
+    return blocks[np.arange(rows * cols), majority].reshape(rows, cols)
+
+
+def read_tiles(image_path, tile_height, tile_width):
+    """
+    Method to read an image as tiles of grayscale values, one row of tiles at a time. A .npy file of grayscale values is
+    memory-mapped, so only one tile is ever read from disk at a time. Other formats are opened with PIL and each tile is
+    cropped and converted to grayscale on its own.
+
+    :param image_path (string): path to the image
+    :param tile_height (int): height of each tile in pixels
+    :param tile_width (int): width of each tile in pixels
+    :return: generator of lists of 2D grayscale arrays, one list per row of tiles from top to bottom, each left to right
+    """
+    if image_path.endswith(".npy"):
+        image = np.load(image_path, mmap_mode="r")
+        height, width = image.shape[:2]
+        for top in range(0, height, tile_height):
+            yield [np.asarray(image[top:top + tile_height, left:left + tile_width]) for left in range(0, width, tile_width)]
+    else:
+        with Image.open(image_path) as image:
+            width, height = image.size
+            for top in range(0, height, tile_height):
+                bottom = min(top + tile_height, height)
+                yield [np.asarray(image.crop((left, top, min(left + tile_width, width), bottom)).convert("L"))
+                       for left in range(0, width, tile_width)]
+
+
+def image_to_grid(image_path, block_size=5, tile_rows=64, tile_cols=64):
+    """
+    Method to convert an aerial image to a grid of majority grayscale values, one tile of tile_rows x tile_cols blocks at a
+    time.
+
+    :param image_path (string): path to the image
+    :param block_size (int): width and height of a grid cell in pixels
+    :param tile_rows (int): number of grid rows computed per tile of the image
+    :param tile_cols (int): number of grid columns computed per tile of the image
+    :return: 2D uint8 array with one cell per block
+    """
+    strips = [np.concatenate([block_majority(tile, block_size) for tile in tiles], axis=1)
+              for tiles in read_tiles(image_path, block_size * tile_rows, block_size * tile_cols)]
+    return np.concatenate(strips, axis=0)
+
+
+def save_grid(grid, output_path):
+    """
+    Method to save a grid in the JSON raster format that the sites are compiled from
+
+    :param grid (numpy array): 2D array of grayscale values
+    :param output_path (string): path of the JSON file to write
+    """
+    with open(output_path, "w") as f:
+        json.dump(grid.tolist(), f)
+
+
+def main():
+    """
+    Command line entry point. Run from the src folder, for example:
+    python -m Environment.ImageToGrid Environment/Apartment_Complex.jpg --site apartment
+    """
+    parser = argparse.ArgumentParser(description="Convert an aerial image into a site grid of majority grayscale values")
+    parser.add_argument("image", help="image to convert, or a .npy array of grayscale values")
+    parser.add_argument("output", nargs="?", help="JSON file to write the grid to")
+    parser.add_argument("--site", choices=sorted(Site.sources), help="replace the raster of this site and recompile it")
+    parser.add_argument("--block-size", type=int, default=5, help="width and height of a grid cell in pixels")
+    parser.add_argument("--tile-rows", type=int, default=64, help="grid rows computed per tile of the image")
+    parser.add_argument("--tile-cols", type=int, default=64, help="grid columns computed per tile of the image")
+    args = parser.parse_args()
+    if (args.output is None) == (args.site is None):
+        parser.error("give either an output file or --site")
+
+    grid = image_to_grid(args.image, args.block_size, args.tile_rows, args.tile_cols)
+    output_path = args.output or os.path.join(ENVIRONMENT_DIR, Site.sources[args.site])
+    save_grid(grid, output_path)
+    print("Wrote %d x %d grid to %s" % (grid.shape[1], grid.shape[0], output_path))
+    if args.site is not None:
+        print("Compiled " + Site.compile(args.site))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+class LayoutTransaction:
+    """
+    LayoutTransaction class recording the edits made to a grid in place so they can be undone. Every write to the numerical
+    grid saves the old values of only the squares it touches, and every tree planted or removed is logged, so rolling back
+    costs as much as the edits did instead of a copy of the whole grid. Used as a context manager, the edits are kept when the
+    block ends unless they were rolled back, and are rolled back if the block raises.
+
+    Attributes:
+        grid (Grid): grid being edited
+        cells (list): (rows, columns, old values) of every write to the numerical grid, oldest first
+        trees (list): ((x, y), tree type id or None) planted on a square before every tree change, oldest first
+    """
+
+    def __init__(self, grid):
+        """
+        Constructor for the LayoutTransaction class
+
+        :param grid (Grid): grid to edit
+        """
+        self.grid = grid
+        self.cells = []
+        self.trees = []
+
+    def __enter__(self):
+        self.grid.transaction = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        self.grid.transaction = None
+        return False
+
+    def log_cells(self, rows, cols):
+        """
+        Method to save the squares of the numerical grid that are about to be written
+
+        :param rows (numpy array): y coordinates of the squares
+        :param cols (numpy array): x coordinates of the squares
+        """
+        self.cells.append((rows, cols, self.grid.numerical_grid[rows, cols]))
+
+    def log_tree(self, base, species):
+        """
+        Method to save what was planted on a square before a tree change
+
+        :param base (int, int): (x, y) coordinates of the tree base
+        :param species (int): tree type id planted there before the change, or None if there was no tree
+        """
+        self.trees.append((base, species))
+
+    def rollback(self):
+        """
+        Method to undo every edit made since the transaction started or was last rolled back
+        """
+        transaction, self.grid.transaction = self.grid.transaction, None #undoing is not logged
+        numerical_grid = self.grid.numerical_grid
+        for rows, cols, values in reversed(self.cells):
+            self.grid.log_cells(rows, cols)
+            numerical_grid[rows, cols] = values
+        for (x, y), species in reversed(self.trees):
+            self.grid.unplant(x, y)
+            if species is not None:
+                self.grid.place(x, y, species)
+        self.cells.clear()
+        self.trees.clear()
+        self.grid.transaction = transaction
@@ -0,0 +1,52 @@
+import weakref
+import numpy as np
+
+
+class PopulationArena:
+    """
+    PopulationArena class to keep the numerical grids of a whole population in one preallocated (slots, y, x) int8 array.
+    Each Grid attached to the arena takes a slot when its numerical grid is first needed and uses a view into that slot as its
+    numerical grid. The slot is handed back when the Grid is garbage collected, so selection and cloning reuse slots instead of
+    allocating new arrays. If every slot is taken, grids fall back to their own array.
+
+    Attributes:
+        x (int): x size of each grid
+        y (int): y size of each grid
+        layouts (numpy array): 3D int8 array holding one numerical grid per slot
+        free_slots (list): slots not currently owned by a grid
+    """
+
+    def __init__(self, x, y, capacity):
+        """
+        Constructor for the PopulationArena class
+
+        :param x (int): x size of each grid
+        :param y (int): y size of each grid
+        :param capacity (int): number of slots to preallocate
+        """
+        self.x = x
+        self.y = y
+        self.layouts = np.zeros((capacity, y, x), dtype=np.int8)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+    def acquire(self, owner):
+        """
+        Method to take a cleared slot for a grid. The slot is released automatically when the owner is garbage collected.
+
+        :param owner (Grid): grid that will use the slot
+        :return: (numerical grid view, release callback), or (None, None) if every slot is taken
+        """
+        if not self.free_slots:
+            return None, None
+        slot = self.free_slots.pop()
+        layout = self.layouts[slot]
+        layout.fill(0)
+        return layout, weakref.finalize(owner, self.free_slots.append, slot)
+
+    def slots_in_use(self):
+        """
+        Method to count the slots owned by grids
+
+        :return: number of slots in use
+        """
+        return len(self.layouts) - len(self.free_slots)
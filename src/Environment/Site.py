@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Trees.TreeFootprint import TreeFootprint
+
+ENVIRONMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPILED_DIR = os.path.join(ENVIRONMENT_DIR, "compiled")
+
+
+#zones of the apartment complex raster, looked up by grayscale value
+ZONE_NONE, ZONE_PLANTABLE, ZONE_ROAD, ZONE_BIG_TREE, ZONE_PEDESTRIAN = range(5)
+ZONE_LOOKUP = np.full(256, ZONE_NONE, dtype=np.uint8)
+ZONE_LOOKUP[101] = ZONE_PLANTABLE #blue grayscale value, or yellow inside the hedge region
+ZONE_LOOKUP[63] = ZONE_BIG_TREE #red grayscale value
+ZONE_LOOKUP[77] = ZONE_ROAD #green grayscale value
+ZONE_LOOKUP[168] = ZONE_PEDESTRIAN #orange grayscale value
+
+
+class Site:
+    """
+    Site class holding the static layers of a planting environment. A site is compiled once from its JSON raster into a
+    versioned bundle of .npy layers, which is then memory-mapped read-only and shared by every Grid of the same scenario in
+    the process. Rebuilding a population therefore never re-parses the raster. The bundle also holds a static fit map for
+    every footprint radius of the species catalog, marking the squares a tree of that radius can have its base on as far as
+    the site alone is concerned, so plantings the site rules out are turned down with one lookup.
+
+    Attributes:
+        name (string): name of the site, used for the bundle directory
+        x (int): x size of the site
+        y (int): y size of the site
+        road (numpy array): 2D boolean array of squares by a road
+        plantable (numpy array): 2D boolean array of plantable squares
+        hedge (numpy array): 2D boolean array of hedge squares
+        big_tree_area (numpy array): 2D boolean array of big tree area squares
+        pedestrian_road (numpy array): 2D boolean array of squares by a pedestrian road
+        layer_cells (dict): layer name -> (rows, columns) index arrays of its squares, built on first use by cells
+        fit_maps (dict): footprint radius -> 2D boolean array of squares a tree of that radius covers only plantable squares from
+    """
+
+    # bump when the compiled layers change so stale bundles are rebuilt
+    FORMAT_VERSION = 2
+    LAYERS = ("road", "plantable", "hedge", "big_tree_area", "pedestrian_road")
+
+    # scenario number -> site name, and site name -> raster the site is compiled from
+    scenario_sites = {1: "apartment", 2: "apartment", 3: "park"}
+    sources = {"apartment": "apartment_grid.json", "park": "park_grid.json"}
+
+    # sites already loaded in this process, keyed by name
+    _loaded = {}
+
+    def __init__(self, name, layers, fit_maps):
+        """
+        Constructor for the Site class
+
+        :param name (string): name of the site
+        :param layers (dict): layer name -> 2D boolean numpy array
+        :param fit_maps (dict): footprint radius -> 2D boolean numpy array
+        """
+        self.name = name
+        for layer in self.LAYERS:
+            setattr(self, layer, layers[layer])
+        self.y, self.x = self.plantable.shape
+        self.layer_cells = {}
+        self.fit_maps = fit_maps
+
+    @classmethod
+    def load(cls, scenario):
+        """
+        Method to get the shared Site object for a scenario. The bundle is compiled on first use, or again if the source raster,
+        the format version or the footprint radii of the species catalog have changed since it was compiled.
+
+        :param scenario (int): scenario number
+        :return: Site object
+        """
+        return cls.named(cls.scenario_sites[scenario])
+
+    @classmethod
+    def named(cls, name):
+        """
+        Method to get the shared Site object by site name
+
+        :param name (string): name of the site
+        :return: Site object
+        """
+        if name not in cls._loaded:
+            bundle = cls.bundle_path(name)
+            if not cls.is_current(name, bundle):
+                cls.compile(name)
+            layers = {layer: np.load(os.path.join(bundle, layer + ".npy"), mmap_mode="r") for layer in cls.LAYERS}
+            fit_maps = {radius: np.load(os.path.join(bundle, "fits_r%d.npy" % radius), mmap_mode="r")
+                        for radius in cls.footprint_radii()}
+            cls._loaded[name] = cls(name, layers, fit_maps)
+        return cls._loaded[name]
+
+    def cells(self, layer):
+        """
+        Method to get the squares of a layer as index arrays, in row by row order. They are found once per site and shared, so
+        code that only visits the squares of a zone does not scan the whole site.
+
+        :param layer (string): name of the layer, one of LAYERS
+        :return: (rows, columns) read-only int numpy arrays
+        """
+        if layer not in self.layer_cells:
+            rows, cols = np.nonzero(getattr(self, layer))
+            rows.flags.writeable = False
+            cols.flags.writeable = False
+            self.layer_cells[layer] = rows, cols
+        return self.layer_cells[layer]
+
+    def fit_map(self, radius):
+        """
+        Method to get the static fit map of a footprint radius. A tree of that radius can only be planted with its base on a
+        true square, whatever else is planted.
+
+        :param radius (int): footprint radius of the tree, in squares
+        :return: 2D read-only boolean numpy array
+        """
+        return self.fit_maps[radius]
+
+    def fits(self, x, y, radius):
+        """
+        Method to check if the site alone allows a tree of a radius to have its base on a square
+
+        :param x (int): x coordinate of the tree base
+        :param y (int): y coordinate of the tree base
+        :param radius (int): footprint radius of the tree, in squares
+        :return: true if every square of the footprint is plantable, false otherwise
+        """
+        return bool(self.fit_maps[radius][y, x])
+
+    @staticmethod
+    def footprint_radii():
+        """
+        Method to get the footprint radii of the species catalog, one fit map is compiled for each
+
+        :return: sorted list of int radii
+        """
+        return sorted(set(SpeciesCatalog.load().radius.tolist()))
+
+    def __deepcopy__(self, memo):
+        #sites are read-only, so copies of a grid share the same site
+        return self
+
+    def __reduce__(self):
+        #pickle by name so that other processes map their own copy of the bundle
+        return Site.named, (self.name,)
+
+    @classmethod
+    def bundle_path(cls, name):
+        """
+        Method to get the directory of a compiled site bundle
+
+        :param name (string): name of the site
+        :return: path to the bundle directory
+        """
+        return os.path.join(COMPILED_DIR, "%s.v%d" % (name, cls.FORMAT_VERSION))
+
+    @classmethod
+    def source_digest(cls, name):
+        """
+        Method to hash the source raster of a site, used to detect stale bundles
+
+        :param name (string): name of the site
+        :return: sha1 hex digest of the source file
+        """
+        with open(os.path.join(ENVIRONMENT_DIR, cls.sources[name]), "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @classmethod
+    def is_current(cls, name, bundle):
+        """
+        Method to check that a bundle exists and was compiled from the current source raster and species catalog
+
+        :param name (string): name of the site
+        :param bundle (string): path to the bundle directory
+        :return: true if the bundle can be used, false otherwise
+        """
+        try:
+            with open(os.path.join(bundle, "meta.json"), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (meta.get("version") == cls.FORMAT_VERSION and meta.get("source_sha1") == cls.source_digest(name)
+                and meta.get("radii") == cls.footprint_radii())
+
+    @classmethod
+    def compile(cls, name):
+        """
+        Method to compile a site raster into a bundle of .npy layers. The bundle is written to a temporary directory and
+        moved into place so that concurrent processes never see a half written bundle.
+
+        :param name (string): name of the site
+        :return: path to the bundle directory
+        """
+        with open(os.path.join(ENVIRONMENT_DIR, cls.sources[name]), "r") as f:
+            raster = np.array(json.load(f))
+        if name == "apartment":
+            layers = create_layers_apartment(raster)
+        else:
+            layers = create_layers_edinburgh(raster)
+
+        os.makedirs(COMPILED_DIR, exist_ok=True)
+        bundle = cls.bundle_path(name)
+        staging = tempfile.mkdtemp(prefix=name + ".", dir=COMPILED_DIR)
+        for layer in cls.LAYERS:
+            np.save(os.path.join(staging, layer + ".npy"), np.ascontiguousarray(layers[layer], dtype=bool))
+        #the footprint of a tree only covers plantable squares where the plantable layer eroded by the footprint disk is set
+        for radius in cls.footprint_radii():
+            np.save(os.path.join(staging, "fits_r%d.npy" % radius), TreeFootprint.erode(layers["plantable"], radius))
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({"version": cls.FORMAT_VERSION, "source": cls.sources[name], "source_sha1": cls.source_digest(name),
+                       "shape": list(raster.shape), "radii": cls.footprint_radii()}, f)
+
+        shutil.rmtree(bundle, ignore_errors=True)
+        try:
+            os.rename(staging, bundle)
+        except OSError: #another process finished compiling first
+            shutil.rmtree(staging, ignore_errors=True)
+        return bundle
+
+
+def create_layers_apartment(raster):
+    """
+    Method to classify the apartment complex raster into site layers. Each grayscale value of the raster marks a zone, after
+    which known problem cells are fixed by hand and gaps inside each zone are filled in from the surrounding squares.
+
+    :param raster (numpy array): 2D array of grayscale values
+    :return: dict of layer name -> 2D boolean numpy array
+    """
+    #classify every square at once through a lookup table of grayscale value -> zone
+    zones = ZONE_LOOKUP[raster]
+    rows, cols = np.indices(raster.shape)
+    hedge_region = ((cols > 316) & (cols < 320)) | (rows < 22) #blue squares here are the yellow hedge
+    plantable = zones != ZONE_NONE
+    road = zones == ZONE_ROAD
+    big_tree_area = zones == ZONE_BIG_TREE
+    pedestrian_road = zones == ZONE_PEDESTRIAN
+    hedge = (zones == ZONE_PLANTABLE) & hedge_region
+
+    #hard coding problem cells, given as (x, y) corners of each rectangle
+    #(161, 63)     (166, 63)
+    #(161, 107)     (166, 107)
+    pedestrian_road[63:108, 161:165] = True #fixing pedestiran road that is not set
+    #(167, 101)     (274, 101)
+    #(167, 106)     (274, 106)
+    plantable[101:107, 167:275] = True
+    #(75, 142)      (77, 142)
+    #(75, 189)      (77, 189)
+    plantable[142:190, 75:78] = True
+    #(40, 254)     (141, 254)
+    #(40, 259)     (141, 259)
+    plantable[254:260, 40:142] = True
+    #(167, 393)    (170, 393)
+    #(167, 427)    (170, 427)
+    plantable[393:428, 167:171] = True
+    #(170, 427)    (314, 427)
+    #(170, 432)    (314, 432)
+    plantable[427:433, 170:315] = True
+    #(162, 279)   (167, 279)
+    #(162, 324)   (167, 324)
+    pedestrian_road[279:325, 162:166] = True
+    #(167, 319)   (314, 319)
+    #(167, 323)   (314, 323)
+    plantable[319:324, 167:315] = True
+    #(162, 171(  (162, 215)
+    #(166, 171)   (166, 215)
+    pedestrian_road[171:216, 162:167] = True
+    #(145, 217)    (145, 258)
+    #(149, 217)    (149, 258)
+    pedestrian_road[217:259, 145:150] = True
+
+    #fill in the gaps by checking if the surrounding squares are of certain type and fill in the square as that type
+    fill_gaps(road, True)
+    fill_gaps(pedestrian_road, True)
+    fill_gaps(hedge, False)
+    fill_gaps(big_tree_area, False)
+    fill_gaps(plantable, True)
+
+    return {"road": road, "plantable": plantable, "hedge": hedge, "big_tree_area": big_tree_area,
+            "pedestrian_road": pedestrian_road}
+
+
+def fill_gaps(layer, wide):
+    """
+    Method to fill in single square gaps of a layer in place. A square is set if its four neighbours are set, or, for wide
+    layers, if the four squares two steps away are set. The original scan went row by row, so squares filled earlier in the
+    scan counted as set for the squares after them. To match it exactly, the neighbours above and to the left are read from
+    the layer as it is being filled and the neighbours below and to the right from the layer before filling, and the shifted
+    array pass is repeated until nothing changes. Filling only ever sets squares, so this settles on the row by row result.
+
+    :param layer (numpy array): 2D boolean array to fill
+    :param wide (bool): also fill squares whose neighbours two steps away are set
+    """
+    y, x = layer.shape
+    before = layer.copy()
+    inner = (slice(3, y - 3), slice(3, x - 3))
+    while True:
+        filled = (layer[2:y - 4, 3:x - 3] & before[4:y - 2, 3:x - 3] & layer[3:y - 3, 2:x - 4] & before[3:y - 3, 4:x - 2])
+        if wide:
+            filled |= (layer[1:y - 5, 3:x - 3] & before[5:y - 1, 3:x - 3] & layer[3:y - 3, 1:x - 5] & before[3:y - 3, 5:x - 1])
+        filled |= before[inner]
+        if np.array_equal(filled, layer[inner]):
+            return
+        layer[inner] = filled
+
+
+def create_layers_edinburgh(raster):
+    """
+    Method to classify the Sundial Garden raster into site layers. Only the plantable layer is used in this scenario.
+
+    :param raster (numpy array): 2D array of grayscale values
+    :return: dict of layer name -> 2D boolean numpy array
+    """
+    layers = {layer: np.zeros(raster.shape, dtype=bool) for layer in Site.LAYERS}
+    layers["plantable"] = raster != 255 #if 255, then not plantable
+    return layers
+
+
+if __name__ == "__main__":
+    for site_name in Site.sources:
+        print("Compiled " + Site.compile(site_name))
@@ -1,4 +1,3 @@
-import copy
 from Trees.TreeSpacing import TreeSpacing
 from Trees.TreeGenerator import TreeGenerator
 import random
@@ -16,6 +15,9 @@ class AlgorithmMutations:
     :param env (Grid object): environment object
     """
 
+    #largest distance in squares local_search moves a tree that does not fit where it was asked for
+    LOCAL_SEARCH_RADIUS = 3
+
     def __init__(self, tree_types_dict, env):
         """
         Constructor for the AlgorithmMutations class
@@ -38,8 +40,9 @@ class AlgorithmMutations:
         :param y (int): y coordinate
         :return: cpprdinates of the center of the tree
         """
-        if self.env.grid[y][x].tree:
-            return self.env.grid[y][x].tree.getPlantingLocation()
+        base = self.env.tree_at(x, y)
+        if base:
+            return base
         else:
             return None, None #no tree in position, is a plantable area
 
@@ -55,24 +58,30 @@ class AlgorithmMutations:
         :return: boolean if tree is plantable
         """
 
+        #the None tree type is not a tree, so there is nothing to plant
+        if tree_type == 0:
+            return False
+
+        #if the site alone rules the position out, no tree object is built and only the local search is tried
+        if not self.env.site.fits(x, y, self.env.tree_radius(tree_type)):
+            return self.local_search(tree_type, x, y)
+
         tree = self.generator.generateTree(self.tree_types_dict[tree_type], (x, y)) #generate tree object
-        occupied_spots, numerical_representation = tree.returnOccupiedSpots() #return occupied spots of coordinates
-        numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-        numerical_grid_copy, plantable = self.spacing.update_coords(occupied_spots, numerical_grid_copy, numerical_representation, (x, y), self.env) #update grid with new tree
-        self.env.numerical_grid = numerical_grid_copy
+        occupied_spots, numerical_representation = tree.returnOccupiedSpots(self.env.x, self.env.y) #return occupied spots of coordinates
+        #the grid is only written if the tree fits, so a failed attempt leaves nothing to undo
+        _, plantable = self.spacing.update_coords(occupied_spots, self.env.numerical_grid, numerical_representation, (x, y), self.env) #update grid with new tree
 
         #if not plantable, search localized grid to place tree in a plantable area
         if not plantable:
             plantable = self.local_search(tree_type, x, y)
         else:
-            for spot in occupied_spots: #update the grid with the new tree object if plantable
-                y, x = spot
-                self.env.plant(x, y, tree)
+            self.env.plant(x, y, tree) #update the grid with the new tree object if plantable
         return plantable
 
     def overlay_tree(self, tree_type, x, y):
         """
-        Method to overlay a tree on top of another tree. If the new tree does not fit, the old tree is reverted back to its original position.
+        Method to overlay a tree on top of another tree. The old tree is removed in place inside a transaction, which is rolled
+        back to restore the old tree if the new tree does not fit.
 
         :param tree_type (int): tree id of the tree to plant
         :param x (int): x coordinate
@@ -81,22 +90,29 @@ class AlgorithmMutations:
         #find old tree object in position
         old_x, old_y = self.snap_to_center(x, y)
         if old_x is not None: #if there is a tree in position
-            old_tree = self.env.grid[old_y][old_x].tree
-            #create temp grid copy to revert back to if new tree does not fit
-            temp_grid = copy.deepcopy(self.env.numerical_grid)
-            #take occupied spots and turn to 0
-            occupied_spots, numerical_representation = old_tree.returnOccupiedSpots()
-            numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-            numerical_grid_copy = self.spacing.remove_tree(occupied_spots, numerical_grid_copy, self.env)
-            self.env.numerical_grid = numerical_grid_copy
-
-            #now overlay new tree
-            plantable = self.plant_tree(tree_type, x, y)
-            if not plantable: #if new tree does not fit, revert back to old tree
-                self.env.numerical_grid = temp_grid
+            old_tree = self.env.make_tree(old_x, old_y)
+            with self.env.transact() as transaction:
+                #take occupied spots and turn to 0
+                occupied_spots, numerical_representation = old_tree.returnOccupiedSpots(self.env.x, self.env.y)
+                self.spacing.remove_tree(occupied_spots, self.env.numerical_grid, self.env)
+
+                #now overlay new tree
+                plantable = self.plant_tree(tree_type, x, y)
+                if not plantable: #if new tree does not fit, revert back to old tree
+                    transaction.rollback()
         else: #no tree in position, just plant new tree
             self.plant_tree(tree_type, x, y)
 
+    def remove_tree(self, x, y):
+        """
+        Method to remove the tree whose base is at a given x, y coordinate
+
+        :param x (int): x coordinate of the tree base
+        :param y (int): y coordinate of the tree base
+        """
+        tree = self.env.make_tree(x, y)
+        self.spacing.remove_tree(tree.returnOccupiedSpots(self.env.x, self.env.y)[0], self.env.numerical_grid, self.env)
+
     def swap_trees(self, x1, y1, x2, y2):
         """
         Method to swap two trees in the environment. If one of the spots is empty, the tree is moved to the empty spot.
@@ -108,32 +124,28 @@ class AlgorithmMutations:
         :param y2 (int): y coordinate of second tree
         """
         #if x1, y1 and x2, y2 is a tree, save the tree object
-        tree1 = self.env.grid[y1][x1].tree
-        tree2 = self.env.grid[y2][x2].tree
+        base1 = self.env.tree_at(x1, y1)
+        base2 = self.env.tree_at(x2, y2)
+        tree1 = self.env.make_tree(*base1) if base1 else None
+        tree2 = self.env.make_tree(*base2) if base2 else None
 
         #swap tree2 to tree1 position using overlay_tree
         if tree1 and not tree2:
             #now remove old tree position
-            numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-            numerical_grid_copy = self.spacing.remove_tree(tree1.returnOccupiedSpots()[0], numerical_grid_copy, self.env)
-            self.env.numerical_grid = numerical_grid_copy
+            self.spacing.remove_tree(tree1.returnOccupiedSpots(self.env.x, self.env.y)[0], self.env.numerical_grid, self.env)
             #now plant
             self.overlay_tree(tree1.getNumericalRepresentation(), x2, y2)
 
         elif tree2 and not tree1:
             #now remove old tree position
-            numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-            numerical_grid_copy = self.spacing.remove_tree(tree2.returnOccupiedSpots()[0], numerical_grid_copy, self.env)
-            self.env.numerical_grid = numerical_grid_copy
+            self.spacing.remove_tree(tree2.returnOccupiedSpots(self.env.x, self.env.y)[0], self.env.numerical_grid, self.env)
             #now plant
             self.overlay_tree(tree2.getNumericalRepresentation(), x1, y1)
 
         elif tree1 and tree2: #can try and swap both trees as both exist
             #remove both trees
-            numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-            numerical_grid_copy = self.spacing.remove_tree(tree1.returnOccupiedSpots()[0], numerical_grid_copy, self.env)
-            numerical_grid_copy = self.spacing.remove_tree(tree2.returnOccupiedSpots()[0], numerical_grid_copy, self.env)
-            self.env.numerical_grid = numerical_grid_copy
+            self.spacing.remove_tree(tree1.returnOccupiedSpots(self.env.x, self.env.y)[0], self.env.numerical_grid, self.env)
+            self.spacing.remove_tree(tree2.returnOccupiedSpots(self.env.x, self.env.y)[0], self.env.numerical_grid, self.env)
 
             self.overlay_tree(tree1.getNumericalRepresentation(), x2, y2)
             self.overlay_tree(tree2.getNumericalRepresentation(), x1, y1)
@@ -144,33 +156,20 @@ class AlgorithmMutations:
 
     def local_search(self, tree_type, curr_x, curr_y):
         """
-        Method to search in a 5x5 grid around the current position to find a plantable area. If found, plant the tree. Otherwise,
-        no tree is planted.
+        Method to search for the nearest position within LOCAL_SEARCH_RADIUS squares of the current position where the tree
+        fits, using the feasibility index of the grid. If found, plant the tree. Otherwise, no tree is planted.
 
         :param tree_type (int): tree id of the tree to plant
         :param curr_x (int): x coordinate about which is center of local search
         :param curr_y (int): y coordinate about which is center of local search
         :return: boolean plantable
         """
-
-        #search in a 4x4 grid around the current position. handle edge cases where the search goes out of bounds
-        min_x = max(0, curr_x - 2)
-        max_x = min(self.env.x, curr_x + 2)
-        min_y = max(0, curr_y - 2)
-        max_y = min(self.env.y, curr_y + 2)
-        for y in range(min_y, max_y):
-            for x in range(min_x, max_x):
-                if x == curr_x and y == curr_y: continue
-                else:
-                    #try and plant tree in position
-                    tree = self.generator.generateTree(self.tree_types_dict[tree_type], (x, y))
-                    occupied_spots, numerical_representation = tree.returnOccupiedSpots()
-                    numerical_grid_copy = copy.deepcopy(self.env.numerical_grid)
-                    numerical_grid_copy, plantable = self.spacing.update_coords(occupied_spots, numerical_grid_copy, numerical_representation, (x, y), self.env)
-                    self.env.numerical_grid = numerical_grid_copy
-                    if plantable:
-                        for spot in occupied_spots:
-                            y, x = spot
-                            self.env.plant(x, y, tree)
-                        return True
-        return False
+        position = self.env.feasibility.nearest(self.env.tree_radius(tree_type), curr_x, curr_y, self.LOCAL_SEARCH_RADIUS)
+        if position is None:
+            return False
+        x, y = position
+        tree = self.generator.generateTree(self.tree_types_dict[tree_type], (x, y))
+        occupied_spots, numerical_representation = tree.returnOccupiedSpots(self.env.x, self.env.y)
+        self.spacing.update_coords(occupied_spots, self.env.numerical_grid, numerical_representation, (x, y), self.env)
+        self.env.plant(x, y, tree)
+        return True
@@ -0,0 +1,138 @@
+import os
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from Environment.Grid import TREE_RECORD
+
+
+def snapshot(generation, population, avg_scores, best_scores):
+    """
+    Method to take the state of a run at the end of a generation, everything needed to continue it exactly: the trees of
+    every individual as TREE_RECORD records, their fitness, the score history and the states of the random number
+    generators. The fitness values and the score history are pickled, so they come back with the types they had, such as
+    ints for a scenario scored in whole numbers. Taking it costs O(trees) and it shares nothing with the run, so it can be
+    written while the run goes on.
+
+    :param generation (int): generation that has just finished
+    :param population (list): population selected at the end of the generation
+    :param avg_scores (list): average fitness of every generation so far
+    :param best_scores (list): best fitness of every generation so far
+    :return: dict of name -> numpy array
+    """
+    records = [individual.grid.records() for individual in population]
+    return {
+        "generation": np.array(generation),
+        "records": np.concatenate(records) if records else np.zeros(0, dtype=TREE_RECORD),
+        "counts": np.array([len(layout) for layout in records], dtype=np.int64),
+        "fitness": pickled([individual.fitness.values for individual in population]),
+        "avg_scores": pickled(avg_scores),
+        "best_scores": pickled(best_scores),
+        "random_state": pickled(random.getstate()),
+        "numpy_state": pickled(np.random.get_state()),
+    }
+
+
+def pickled(value):
+    """
+    Method to store a Python object in a checkpoint as the bytes of its pickle
+
+    :param value: object to store
+    :return: 1D uint8 numpy array
+    """
+    return np.frombuffer(pickle.dumps(value), dtype=np.uint8)
+
+
+def unpickled(array):
+    """
+    Method to get back an object stored with pickled
+
+    :param array (numpy array): 1D uint8 array from pickled
+    :return: the object
+    """
+    return pickle.loads(array.tobytes())
+
+
+def write_checkpoint(path, state):
+    """
+    Method to write a snapshot to a compressed .npz file. It is written next to the file and moved over it, so a run that
+    is stopped while writing leaves the previous checkpoint whole.
+
+    :param path (string): checkpoint file
+    :param state (dict): snapshot of the run
+    """
+    staging = path + ".tmp"
+    with open(staging, "wb") as f:
+        np.savez_compressed(f, **state)
+    os.replace(staging, path)
+
+
+def load_checkpoint(path):
+    """
+    Method to read a checkpoint and restore the states of the random number generators it was taken with
+
+    :param path (string): checkpoint file
+    :return: (generation, layouts, fitness, avg_scores, best_scores), where layouts is a list of TREE_RECORD arrays and
+    fitness a list of fitness tuples, one of each per individual
+    """
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    random.setstate(unpickled(state["random_state"]))
+    np.random.set_state(unpickled(state["numpy_state"]))
+    layouts = np.split(state["records"], np.cumsum(state["counts"])[:-1])
+    fitness = [tuple(values) for values in unpickled(state["fitness"])]
+    return (int(state["generation"]), layouts, fitness, unpickled(state["avg_scores"]),
+            unpickled(state["best_scores"]))
+
+
+class CheckpointWriter:
+    """
+    CheckpointWriter class that writes checkpoints of a run on a background thread. The snapshot is taken on the calling
+    thread, and compressing and writing it overlaps with the next generation. At most one write is in flight, so a run
+    never queues up snapshots faster than they are written, and an error while writing is raised by the next save or close.
+
+    Attributes:
+        path (string): checkpoint file
+        executor (ThreadPoolExecutor): single thread writing the checkpoints
+        pending (Future): write in flight, or None
+    """
+
+    def __init__(self, path):
+        """
+        Constructor for the CheckpointWriter class
+
+        :param path (string): checkpoint file, overwritten by every checkpoint
+        """
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+
+    def save(self, generation, population, avg_scores, best_scores):
+        """
+        Method to checkpoint a run at the end of a generation
+
+        :param generation (int): generation that has just finished
+        :param population (list): population selected at the end of the generation
+        :param avg_scores (list): average fitness of every generation so far
+        :param best_scores (list): best fitness of every generation so far
+        """
+        state = snapshot(generation, population, avg_scores, best_scores)
+        self.wait()
+        self.pending = self.executor.submit(write_checkpoint, self.path, state)
+
+    def wait(self):
+        """
+        Method to wait for the write in flight, if any
+        """
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.result()
+
+    def close(self):
+        """
+        Method to finish the write in flight and stop the writing thread
+        """
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
@@ -1,15 +1,25 @@
+import copy
+import multiprocessing
+import os
 import random
+import time
 from Constraints.EdinburghConstraints import EdinburghConstraints
 from Constraints.ScenarioOneConstraints import ScenarioOneConstraints
 from Environment.Grid import Grid
+from Environment.PopulationArena import PopulationArena
 import numpy as np
 from deap import base, creator, tools
 import json
 import matplotlib.pyplot as plt
-from GeneticAlgorithm.GreedyInitGrid import GreedyInitGrid
 from Trees.TreeSpacing import TreeSpacing
 from Constraints.ScenarioTwoConstraints import ScenarioTwoConstraints
 from GeneticAlgorithm.AlgorithmMutations import AlgorithmMutations
+from GeneticAlgorithm.Checkpoint import CheckpointWriter, load_checkpoint
+from GeneticAlgorithm.FitnessCache import FitnessCache
+from GeneticAlgorithm.RunMetrics import MetricsWriter, generation_metrics
+from GeneticAlgorithm.EvaluationBackend import create_backend
+from GeneticAlgorithm.PopulationInit import build_layout, greedy_layout, individual_seeds, init_worker
+from GeneticAlgorithm.SpatialCrossover import CROSSOVER_OPERATORS, block_region, exchange_trees, zone_region
 random.seed(100)
 
 class CustomGeneticChanges:
@@ -44,58 +54,58 @@ class CustomGeneticChanges:
         self.COST_LIMIT = 530000 #cost limit set in paper
         self.co2_threshold = 3500
         self.NUM_TREES = 16 #number of tree types for park scenario
+        self.species_pool = np.array(sorted(i for i in trees_types_dict if i != 0)) #tree types mutate plants, all but None
 
-        self.iterations = 0 #limit number of attempts to find valid starting grid to prevent reaching max recursion depth
+        self.use_arena = True #keep the numerical grids of the population in one PopulationArena
+        self.arena = None
+
+        self.fitness_cache_size = 4096 #fitness values kept by the FitnessCache of a run
+        self.evaluation_backend = "serial" #evaluate the offspring in this process, or on a "thread" or "process" pool
+        self.evaluation_workers = None #threads or processes of the pool, the number of CPUs if None
+        self.evaluation_chunksize = 16 #layouts sent to a worker process at a time
+
+        self.crossover_operators = CROSSOVER_OPERATORS #operators mate picks from at random, see SpatialCrossover
+
+        self.checkpoint_path = None #file the run is checkpointed to, no checkpoints if None
+        self.checkpoint_every = 1 #generations between checkpoints
+        self.resume = False #continue the run from checkpoint_path if the file exists
+        self.metrics_path = None #file the metrics of every generation are streamed to, .csv or JSON lines, none if None
+
+        self.init_workers = 1 #processes building the initial population, built in this process if 1
+        self.init_seed = 100 #seed the random stream of every individual of the initial population is spawned from
         self.previous_individual = None #init previous valid individual to None
 
 
     def mate(self, ind1, ind2):
         """
-        Method to perform one-point crossover on two individuals. The offspring are created by taking the first half of the first individual and the second half of the second individual.
-        The offspring are then checked for plantability and if they are not plantable, they are not planted.
+        Method to perform spatial crossover on two individuals. One of the crossover_operators picks a region of the site, a
+        random rectangle for "block" or a random set of constraint zones for "zone", and the offspring swap the trees based
+        in it. The trees are exchanged as records, so the cost depends on the number of trees rather than the size of the site,
+        and only the trees that clash across the edge of the region are replanted, moved nearby or dropped.
 
         :param ind1 (Individual): first individual to crossover
         :param ind2 (Individual): second individual to crossover
         :return: offspring1, offspring2 (Individual): two offspring created from crossover
         """
-        ind1_grid_flat = ind1.grid.numerical_grid.flatten()
-        ind2_grid_flat = ind2.grid.numerical_grid.flatten()
-
-        size = min(len(ind1_grid_flat), len(ind2_grid_flat))
-        cxpoint = random.randint(1, size - 1)
-
-        # Perform one-point crossover
-        offspring1 = list(ind1_grid_flat[:cxpoint]) + list(ind2_grid_flat[cxpoint:])
-        offspring2 = list(ind2_grid_flat[:cxpoint]) + list(ind1_grid_flat[cxpoint:])
-
-
-        #make crossovers 2d arrays
-        offspring1 = np.array(offspring1).reshape(self.y, self.x)
-        offspring2 = np.array(offspring2).reshape(self.y, self.x)
-
-        #make new individuals
-        ind1 = self.create_individual()
-        ind2 = self.create_individual()
-        #make AlgorithmMutations objects for each individual
-        mutated_ind1 = AlgorithmMutations(self.trees_types_dict, ind1.grid)
-        mutated_ind2 = AlgorithmMutations(self.trees_types_dict, ind2.grid)
-
-        #fill in temporary grids with offspring crossovers to determine valid planting (spatial constraint)
-        for i in range(self.y):
-            for j in range(self.x):
-                #if offspring1[i][j] or offspring2[i][j] is a val > 0, then it is base of tree and position to plant
-                if offspring1[i][j] > 0:
-                    #call plant function, if its not plantable in that position, will not plant
-                    mutated_ind1.plant_tree(offspring1[i][j], j, i) #if not plantable will not plant
-                if offspring2[i][j] > 0:
-                    mutated_ind2.plant_tree(offspring2[i][j], j, i) #if not plantable will not plant
-
-        #return offspring1, offspring2 as flattened arrays
-        return ind1, ind2
+        site = ind1.grid.site
+        operator = random.choice(self.crossover_operators)
+        inside = zone_region(site, random) if operator == "zone" else None
+        if inside is None: #block crossover, or a site with a single zone
+            inside = block_region(self.x, self.y, random)
+
+        records1 = ind1.grid.records()
+        records2 = ind2.grid.records()
+        offspring1 = self.create_individual()
+        offspring2 = self.create_individual()
+        exchange_trees(records1, records2, inside, offspring1.grid, self.trees_types_dict)
+        exchange_trees(records2, records1, inside, offspring2.grid, self.trees_types_dict)
+        return offspring1, offspring2
 
     def mutate(self, individual, indpb):
         """
-        Method to mutate an individual by overlaying a tree on a random position in the grid with a probability of indpb.
+        Method to mutate an individual by overlaying a random tree type of the scenario on every plantable square with a
+        probability of indpb. The number of squares mutated is drawn once from a binomial distribution and the squares are
+        sampled among the plantable ones, then overlaid row by row.
 
         :param individual (Individual): chromosome to mutate
         :param indpb (int): probability of mutation
@@ -103,12 +113,12 @@ class CustomGeneticChanges:
         """
 
         mutated = AlgorithmMutations(self.trees_types_dict, individual.grid)
-        for i in range(individual.grid.y):
-            for j in range(individual.grid.x):
-                if random.random() < indpb:
-                    #tree_type = random.choice([1,5,6,7,8,9,11,12,13,14,15,16,17,18,20,21])  #this line is for scenario 3 (edinburgh park)
-                    tree_type = random.choice([1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21]) #this line is for scenario 1 and 2
-                    mutated.overlay_tree(tree_type, j, i)
+        rows, cols = individual.grid.site.cells("plantable")
+        rng = np.random.default_rng(random.getrandbits(64))
+        picked = np.sort(rng.choice(len(rows), rng.binomial(len(rows), indpb), replace=False))
+        tree_types = rng.choice(self.species_pool, len(picked))
+        for i, j, tree_type in zip(rows[picked].tolist(), cols[picked].tolist(), tree_types.tolist()):
+            mutated.overlay_tree(tree_type, j, i)
         return individual
 
 
@@ -120,9 +130,19 @@ class CustomGeneticChanges:
         :return: Individual with a grid of size x by y
         """
         individual = creator.Individual()
-        individual.grid = Grid(self.x, self.y, self.scenario)
+        individual.grid = Grid(self.x, self.y, self.scenario, self.arena)
         return individual
 
+    def create_arena(self, population_size):
+        """
+        Method to preallocate the PopulationArena for a run, if enabled. There are slots for the population and its offspring,
+        plus a few for the grids built while mating or initialising.
+
+        :param population_size (int): number of individuals in the population
+        """
+        if self.use_arena:
+            self.arena = PopulationArena(self.x, self.y, 2 * population_size + 8)
+
 
     def run_edinburgh_scenario(self):
         """
@@ -137,42 +157,29 @@ class CustomGeneticChanges:
         creator.create("Individual", list, fitness=creator.FitnessMax, grid=None)
 
         #toolbox.register("attr_tree", lambda: next(generation_one))
-        toolbox.register("individual", tools.initIterate, creator.Individual,
-                         lambda: self.init_individual_edinburgh(fitness_eval))
-        toolbox.register("population", tools.initRepeat, list, lambda: self.init_individual_edinburgh(fitness_eval))
+        toolbox.register("population", self.init_population, fitness_eval, "init_grid_edinburgh")
 
-        toolbox.register("evaluate", fitness_eval.evaluate)
+        backend = create_backend(self.evaluation_backend, fitness_eval, self.x, self.y, self.scenario,
+                                 self.evaluation_workers, self.evaluation_chunksize)
+        fitness_cache = FitnessCache(backend, self.fitness_cache_size)
+        toolbox.register("evaluate", fitness_cache)
         toolbox.register("mate", self.mate)
         toolbox.register("mutate", self.mutate, indpb=0.05)
         toolbox.register("select", tools.selTournament, tournsize=3)
 
         # Generate the initial population and run the genetic algorithm:
         population_size = 500
-        population = toolbox.population(n=population_size)
-        avg_scores = []
-        best_scores = []
+        self.create_arena(population_size)
         NGEN = 100
-        for gen in range(NGEN):
-            print("Generation: ", gen)
-            offspring = self.varAnd(population, toolbox, cxpb=0.5, mutpb=0.2)
-            fits = toolbox.map(toolbox.evaluate, offspring)
-            curr_avg = 0
-            best_so_far = 0
-            for fit, ind in zip(fits, offspring):
-                ind.fitness.values = fit
-                curr_avg += ind.fitness.values[0]
-                best_so_far = max(best_so_far, ind.fitness.values[0])
-            print("Best so far: ", best_so_far)
-
-            #append top score to best_scores
-            avg_scores.append(curr_avg / population_size)
-            best_scores.append(best_so_far)
-            population = toolbox.select(offspring, k=len(population))
+        try:
+            population, avg_scores, best_scores = self.evolve(toolbox, fitness_eval, fitness_cache, population_size, NGEN, max)
+        finally:
+            backend.close()
 
         # Find and print the best solution found:
         best_ind = tools.selBest(population, 1)[0]
         print("Best individual is %s, %s" % (best_ind.grid, best_ind.fitness.values))
-        fitness_eval.validate(best_ind.grid.numerical_grid.flatten())
+        fitness_eval.validate(best_ind.grid)
 
         #save the best_grid list as a json file
         with open("best_grid_edinburgh_500.json", "w") as f:
@@ -197,40 +204,28 @@ class CustomGeneticChanges:
         creator.create("FitnessMax", base.Fitness, weights=(1.0,))
         creator.create("Individual", list, fitness=creator.FitnessMax, grid=None)
 
-        toolbox.register("individual", tools.initIterate, creator.Individual, self.init_individual_scenario_two(fitness_eval))
-        toolbox.register("population", tools.initRepeat, list, lambda: self.init_individual_scenario_two(fitness_eval))
-        toolbox.register("evaluate", fitness_eval.evaluate)
+        toolbox.register("population", self.init_population, fitness_eval, "init_grid_scenario_two")
+        backend = create_backend(self.evaluation_backend, fitness_eval, self.x, self.y, self.scenario,
+                                 self.evaluation_workers, self.evaluation_chunksize)
+        fitness_cache = FitnessCache(backend, self.fitness_cache_size)
+        toolbox.register("evaluate", fitness_cache)
         toolbox.register("mate", self.mate)
         toolbox.register("mutate", self.mutate, indpb=0.05)
         toolbox.register("select", tools.selTournament, tournsize=3)
 
         # Generate the initial population and run the genetic algorithm:
         population_size = 250
-        population = toolbox.population(n=population_size)
-        avg_scores = []
-        best_scores = []
+        self.create_arena(population_size)
         NGEN = 100
-        for gen in range(NGEN):
-            print("Generation: ", gen)
-            offspring = self.varAnd(population, toolbox, cxpb=0.5, mutpb=0.2)
-            fits = toolbox.map(toolbox.evaluate, offspring)
-            curr_avg = 0
-            best_so_far = 0
-            for fit, ind in zip(fits, offspring):
-                ind.fitness.values = fit
-                curr_avg += ind.fitness.values[0]
-                best_so_far = max(best_so_far, ind.fitness.values[0])
-            print("Best so far: ", best_so_far)
-
-            #append top score to best_scores
-            avg_scores.append(curr_avg / population_size)
-            best_scores.append(best_so_far)
-            population = toolbox.select(offspring, k=len(population))
+        try:
+            population, avg_scores, best_scores = self.evolve(toolbox, fitness_eval, fitness_cache, population_size, NGEN, max)
+        finally:
+            backend.close()
 
         # Find and print the best solution found:
         best_ind = tools.selBest(population, 1)[0]
         print("Best individual is %s, %s" % (best_ind.grid, best_ind.fitness.values))
-        fitness_eval.validate(best_ind.grid.numerical_grid.flatten())
+        fitness_eval.validate(best_ind.grid)
 
         #save the best_grid list as a json file
         with open("best_grid_s2_500.json", "w") as f:
@@ -267,6 +262,92 @@ class CustomGeneticChanges:
         plt.savefig('best_fitness_s1_500_50gen.png')
         plt.show()
 
+    def evaluate_invalid(self, offspring, fitness_cache):
+        """
+        Method to evaluate the offspring whose fitness is invalid. Offspring that were cloned without crossover or mutation
+        keep the fitness of their parent, so they are not evaluated again. The rest are evaluated together so the evaluation
+        backend can spread them over its workers.
+        :param offspring (list): list of offspring
+        :param fitness_cache (FitnessCache): cache in front of the evaluation backend of the run
+        """
+        invalid = [ind for ind in offspring if not ind.fitness.valid]
+        fits = fitness_cache.evaluate_all(invalid)
+        for fit, ind in zip(fits, invalid):
+            ind.fitness.values = fit
+
+    def evolve(self, toolbox, fitness_eval, fitness_cache, population_size, ngen, best):
+        """
+        Method to run the generations of the genetic algorithm. The population is built by the toolbox, or restored from the
+        checkpoint when resuming. With a checkpoint_path, the run is checkpointed every checkpoint_every generations and after
+        the last one, on a background thread, and a resumed run continues exactly as if it had not been stopped. With a
+        metrics_path, the metrics of every generation and the time spent on variation, evaluation and selection are streamed
+        to it, and a resumed run first drops the metrics of the generations after its checkpoint.
+
+        :param toolbox: defined by deap library, with population, mate, mutate and select registered
+        :param fitness_eval: fitness evaluation object of the scenario
+        :param fitness_cache (FitnessCache): cache in front of the evaluation backend of the run
+        :param population_size (int): number of individuals in the population
+        :param ngen (int): number of generations
+        :param best (function): min or max, whichever picks the best of the fitness values
+        :return: (population, avg_scores, best_scores) at the end of the run
+        """
+        resuming = self.resume and self.checkpoint_path is not None and os.path.exists(self.checkpoint_path)
+        if resuming:
+            generation, layouts, fitness, avg_scores, best_scores = load_checkpoint(self.checkpoint_path)
+            population = []
+            for records, values in zip(layouts, fitness):
+                individual = self.create_individual()
+                individual.grid.load_records(records)
+                individual.fitness.values = values
+                population.append(individual)
+            start = generation + 1
+            print("Resuming from generation", start)
+        else:
+            population = toolbox.population(n=population_size)
+            avg_scores = []
+            best_scores = []
+            start = 0
+
+        writer = CheckpointWriter(self.checkpoint_path) if self.checkpoint_path is not None else None
+        metrics = None
+        if self.metrics_path is not None:
+            metrics = MetricsWriter(self.metrics_path, start - 1 if resuming else None)
+        try:
+            for gen in range(start, ngen):
+                print("Generation: ", gen)
+                started = time.perf_counter()
+                offspring = self.varAnd(population, toolbox, cxpb=0.5, mutpb=0.2)
+                varied = time.perf_counter()
+                self.evaluate_invalid(offspring, fitness_cache)
+                evaluated = time.perf_counter()
+                curr_avg = 0
+                best_so_far = 0 if best is max else float('inf')
+                for ind in offspring:
+                    curr_avg += ind.fitness.values[0]
+                    best_so_far = best(best_so_far, ind.fitness.values[0])
+                print("Best so far: ", best_so_far)
+                cache_counts = fitness_cache.reset_counts()
+                print("Fitness cache hits: %d, misses: %d" % cache_counts)
+
+                #append top score to best_scores
+                avg_scores.append(curr_avg / population_size)
+                best_scores.append(best_so_far)
+                selecting = time.perf_counter()
+                population = toolbox.select(offspring, k=len(population))
+
+                if metrics is not None:
+                    timings = {"variation": varied - started, "evaluation": evaluated - varied,
+                               "selection": time.perf_counter() - selecting}
+                    metrics.write(generation_metrics(gen, offspring, fitness_eval.engine, best, timings, cache_counts))
+                if writer is not None and ((gen + 1) % self.checkpoint_every == 0 or gen + 1 == ngen):
+                    writer.save(gen, population, avg_scores, best_scores)
+        finally:
+            if writer is not None:
+                writer.close()
+            if metrics is not None:
+                metrics.close()
+        return population, avg_scores, best_scores
+
     def varAnd(self, population, toolbox, cxpb, mutpb):
         """
         Method to apply crossover and mutation to the population. The offspring are created by applying crossover to the population and then applying mutation to the offspring.
@@ -277,15 +358,18 @@ class CustomGeneticChanges:
         :param mutpb (int): chance of applying mutation function
         :return: offspring (list): list of offspring
         """
-        offspring = [toolbox.clone(ind) for ind in population]
+        offspring = list(population)
 
-        # Apply crossover and mutation on the offspring
+        # Apply crossover and mutation on the offspring. mate builds new individuals from the trees of the parents without
+        # changing them, so only the individuals left over from the population are cloned, which is copy on write
         for i in range(1, len(offspring), 2):
             if random.random() < cxpb:
                 offspring[i - 1], offspring[i] = toolbox.mate(offspring[i - 1], offspring[i])
                 del offspring[i - 1].fitness.values, offspring[i].fitness.values
 
         for i in range(len(offspring)):
+            if offspring[i] is population[i]:
+                offspring[i] = toolbox.clone(offspring[i])
             if random.random() < mutpb:
                 offspring[i] = toolbox.mutate(offspring[i])
                 del offspring[i].fitness.values
@@ -304,40 +388,28 @@ class CustomGeneticChanges:
         toolbox = base.Toolbox()
         creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
         creator.create("Individual", list, fitness=creator.FitnessMin, grid=None)
-        toolbox.register("individual", tools.initIterate, creator.Individual, self.init_individual_scenario_one(fitness_eval))
-        toolbox.register("population", tools.initRepeat, list, lambda: self.init_individual_scenario_one(fitness_eval))
-        toolbox.register("evaluate", fitness_eval.evaluate)
+        toolbox.register("population", self.init_population, fitness_eval, "init_grid_scenario_one")
+        backend = create_backend(self.evaluation_backend, fitness_eval, self.x, self.y, self.scenario,
+                                 self.evaluation_workers, self.evaluation_chunksize)
+        fitness_cache = FitnessCache(backend, self.fitness_cache_size)
+        toolbox.register("evaluate", fitness_cache)
         toolbox.register("mate", self.mate)
         toolbox.register("mutate", self.mutate, indpb=0.05)
         toolbox.register("select", tools.selTournament, tournsize=3)
 
         # Generate the initial population and run the genetic algorithm:
         population_size = 1000
-        population = toolbox.population(n=population_size)
-        avg_scores = []
-        best_scores = []
+        self.create_arena(population_size)
         NGEN = 25
-        for gen in range(NGEN):
-            print("Generation: ", gen)
-            offspring = self.varAnd(population, toolbox, cxpb=0.5, mutpb=0.2)
-            fits = toolbox.map(toolbox.evaluate, offspring)
-            curr_avg = 0
-            best_so_far = float('inf')
-            for fit, ind in zip(fits, offspring):
-                ind.fitness.values = fit
-                curr_avg += ind.fitness.values[0]
-                best_so_far = min(best_so_far, ind.fitness.values[0])
-            print("Best so far: ", best_so_far)
-
-            #append top score to best_scores
-            avg_scores.append(curr_avg / population_size)
-            best_scores.append(best_so_far)
-            population = toolbox.select(offspring, k=len(population))
+        try:
+            population, avg_scores, best_scores = self.evolve(toolbox, fitness_eval, fitness_cache, population_size, NGEN, min)
+        finally:
+            backend.close()
 
         # Find and print the best solution found:
         best_ind = tools.selBest(population, 1)[0]
         print("Best individual is %s, %s" % (best_ind.grid, best_ind.fitness.values))
-        fitness_eval.validate(best_ind.grid.numerical_grid.flatten())
+        fitness_eval.validate(best_ind.grid)
 
         #save the best_grid list as a json file
         with open("best_grid_scenario_one_500_50gen.json", "w") as f:
@@ -359,74 +431,106 @@ class CustomGeneticChanges:
             return [tree for tree in start_grid]
         return predefined_tree
 
-    def init_individual_scenario_two(self, fitness_eval):
+    def init_individual_scenario_two(self, fitness_eval, rng=random):
         """
-        Method to initialize the starting population for scenario two. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
-        Continually runs until the population is completely populated. If a start_ind is invalid, the function calls itself again recursively. A max depth of 650 is set to prevent
-        reaching the maximum recursion depth. If the max depth is reached, the previous individual is returned.
+        Method to initialize one individual for scenario two. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
+        Attempts are retried on a fresh grid up to MAX_ATTEMPTS times. If none is valid, the previous individual is returned.
 
         :param fitness_eval (ScenarioTwoConstraints): fitness evaluation object for scenario two
+        :param rng (Random): random number generator to populate the grid with
         :return: Individual
         """
-        #init start grid and validate that the grid abides constraints
-        self.iterations+=1
-        print("Iteration: " + str(self.iterations))
-        init_individual = self.create_individual()
-        mutations = AlgorithmMutations(self.trees_types_dict, init_individual.grid) #init mutations object
-        greedy_alg = GreedyInitGrid(self.x, self.y, init_individual, self.trees_types_dict, self.generator, fitness_eval, mutations) #init greedy algorithm
-        start_ind = greedy_alg.init_grid_scenario_two()
-        if self.iterations > 650:
-            self.iterations = 0
-            print("No valid configuration found, returning previous individual")
-            return self.previous_individual #to prevent max recursion depth set current population to the last one
-        if start_ind == None: return self.init_individual_scenario_two(fitness_eval)
-        #set previous individual to current individual
-        self.previous_individual = start_ind
-        return start_ind
+        return self.init_individual(fitness_eval, "init_grid_scenario_two", rng)
 
-    def init_individual_scenario_one(self, fitness_eval):
+    def init_individual_scenario_one(self, fitness_eval, rng=random):
         """
-        Method to initialize the starting population for scenario one. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
-        Continually runs until the population is completely populated. If a start_ind is invalid, the function calls itself again recursively. A max depth of 650 is set to prevent
-        reaching the maximum recursion depth. If the max depth is reached, the previous individual is returned.
+        Method to initialize one individual for scenario one. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
+        Attempts are retried on a fresh grid up to MAX_ATTEMPTS times. If none is valid, the previous individual is returned.
+
         :param fitness_eval (ScenarioOneConstraints): fitness evaluation object for scenario one
+        :param rng (Random): random number generator to populate the grid with
         :return: Individual
         """
-        self.iterations+=1
-        print("Iteration: " + str(self.iterations))
-        init_individual = self.create_individual()
-        mutations = AlgorithmMutations(self.trees_types_dict, init_individual.grid) #init mutations object
-        greedy_alg = GreedyInitGrid(self.x, self.y, init_individual, self.trees_types_dict, self.generator, fitness_eval, mutations) #init greedy algorithm
-        start_ind = greedy_alg.init_grid_scenario_one()
-        if self.iterations > 650:
-            self.iterations = 0
-            print("No valid configuration found, returning previous individual")
-            return self.previous_individual #to prevent max recursion depth set current population to the last one
-        if start_ind == None: return self.init_individual_scenario_one(fitness_eval)
-        #set previous individual to current individual
-        self.previous_individual = start_ind
-        return start_ind
+        return self.init_individual(fitness_eval, "init_grid_scenario_one", rng)
 
-    def init_individual_edinburgh(self, fitness_eval):
+    def init_individual_edinburgh(self, fitness_eval, rng=random):
         """
-        Method to initialize the starting population for Edinburgh scenario. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
-        Continually runs until the population is completely populated. If a start_ind is invalid, the function calls itself again recursively. A max depth of 650 is set to prevent
-        reaching the maximum recursion depth. If the max depth is reached, the previous individual is returned.
+        Method to initialize one individual for Edinburgh scenario. This method uses the GreedyInitGrid class to generate a starting grid for the genetic algorithm.
+        Attempts are retried on a fresh grid up to MAX_ATTEMPTS times. If none is valid, the previous individual is returned.
 
         :param fitness_eval (EdinburghConstraints): fitness evaluation object for Edinburgh scenario
+        :param rng (Random): random number generator to populate the grid with
         :return: Individual
         """
-        self.iterations+=1
-        print("Iteration: " + str(self.iterations))
-        init_individual = self.create_individual()
-        mutations = AlgorithmMutations(self.trees_types_dict, init_individual.grid) #init mutations object
-        greedy_alg = GreedyInitGrid(self.x, self.y, init_individual, self.trees_types_dict, self.generator, fitness_eval, mutations) #init greedy algorithm
-        start_ind = greedy_alg.init_grid_edinburgh()
-        if self.iterations > 650:
-            self.iterations = 0
+        return self.init_individual(fitness_eval, "init_grid_edinburgh", rng)
+
+    def init_individual(self, fitness_eval, method, rng=random):
+        """
+        Method to initialize one individual with a GreedyInitGrid method, retrying on a fresh grid until it is valid
+
+        :param fitness_eval: fitness evaluation object of the scenario
+        :param method (string): GreedyInitGrid method of the scenario, such as init_grid_edinburgh
+        :param rng (Random): random number generator to populate the grid with
+        :return: Individual, or the previous individual if no attempt was valid
+        """
+        grid, attempts = greedy_layout(self.x, self.y, self.scenario, self.trees_types_dict, self.generator, fitness_eval,
+                                       method, rng, self.arena)
+        print("Attempts: " + str(attempts))
+        if grid is None:
             print("No valid configuration found, returning previous individual")
-            return self.previous_individual #to prevent max recursion depth set current population to the last one
-        if start_ind == None: return self.init_individual_edinburgh(fitness_eval)
-        #set previous individual to current individual
-        self.previous_individual = start_ind
-        return start_ind
\ No newline at end of file
+            return self.previous_individual
+        self.previous_individual = self.individual_from_grid(grid)
+        return self.previous_individual
+
+    def init_population(self, fitness_eval, method, n):
+        """
+        Method to initialize the starting population with a GreedyInitGrid method. Each individual is populated from its own
+        random stream spawned from init_seed, so the population is the same however many workers build it. With more than one
+        worker the individuals are built on a process pool, where a worker takes the next individual as soon as it finishes
+        one, so individuals that need many attempts do not hold up the others.
+
+        :param fitness_eval: fitness evaluation object of the scenario
+        :param method (string): GreedyInitGrid method of the scenario, such as init_grid_edinburgh
+        :param n (int): number of individuals
+        :return: list of Individual
+        """
+        seeds = individual_seeds(self.init_seed, n)
+        grids = [None] * n
+        workers = self.init_workers or 1
+        if workers == 1:
+            for index, seed in enumerate(seeds):
+                grids[index], attempts = greedy_layout(self.x, self.y, self.scenario, self.trees_types_dict, self.generator,
+                                                       fitness_eval, method, random.Random(seed), self.arena)
+                print("Individual " + str(index) + " attempts: " + str(attempts))
+        else:
+            initargs = (self.x, self.y, self.scenario, self.trees_types_dict, self.generator, fitness_eval, method)
+            with multiprocessing.Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+                for index, attempts, records in pool.imap_unordered(build_layout, enumerate(seeds)):
+                    print("Individual " + str(index) + " attempts: " + str(attempts))
+                    if records is not None:
+                        grids[index] = Grid(self.x, self.y, self.scenario, self.arena)
+                        grids[index].load_records(records)
+
+        valid = [grid for grid in grids if grid is not None]
+        if not valid:
+            raise RuntimeError("No valid configuration found for any individual")
+        population = []
+        previous = valid[0]
+        for index, grid in enumerate(grids):
+            if grid is None:
+                print("No valid configuration found for individual " + str(index) + ", copying previous individual")
+                grid = copy.deepcopy(previous)
+            previous = grid
+            population.append(self.individual_from_grid(grid))
+        return population
+
+    def individual_from_grid(self, grid):
+        """
+        Method to make an individual holding a populated grid
+
+        :param grid (Grid): grid to attach
+        :return: Individual
+        """
+        individual = creator.Individual()
+        individual.grid = grid
+        return individual
@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from Environment.Grid import Grid
+
+#state of an evaluation worker process, set up once by init_worker
+_worker_fitness_eval = None
+_worker_layout = None
+
+
+class Layout:
+    """
+    Layout class standing in for an individual in an evaluation worker. The fitness functions only read the grid of an
+    individual, so a worker keeps one Layout and loads each layout it is sent into its grid.
+
+    Attributes:
+        grid (Grid): grid holding the trees of the layout being evaluated
+    """
+
+    __slots__ = ("grid",)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+
+def init_worker(fitness_eval, x, y, scenario):
+    """
+    Method to set up an evaluation worker process. The site is memory mapped and the species catalog is loaded once here,
+    so they stay resident in the worker for the whole run.
+
+    :param fitness_eval: scenario constraints object whose evaluate method gives the fitness
+    :param x (int): x dimension of the grid
+    :param y (int): y dimension of the grid
+    :param scenario (int): scenario of the grid
+    """
+    global _worker_fitness_eval, _worker_layout
+    _worker_fitness_eval = fitness_eval
+    _worker_layout = Layout(Grid(x, y, scenario))
+
+
+def evaluate_records(records):
+    """
+    Method to evaluate one layout in an evaluation worker
+
+    :param records (numpy array): TREE_RECORD records of the layout
+    :return: fitness tuple
+    """
+    _worker_layout.grid.load_records(records)
+    return _worker_fitness_eval.evaluate(_worker_layout)
+
+
+class SerialBackend:
+    """
+    SerialBackend class that evaluates every individual in the calling process, one after another
+
+    Attributes:
+        evaluate (function): fitness function of an individual
+    """
+
+    def __init__(self, evaluate):
+        """
+        Constructor for the SerialBackend class
+
+        :param evaluate (function): fitness function of an individual
+        """
+        self.evaluate = evaluate
+
+    def map(self, individuals):
+        """
+        Method to evaluate individuals
+
+        :param individuals (list): individuals to evaluate
+        :return: list of fitness tuples, in the order of the individuals
+        """
+        return [self.evaluate(individual) for individual in individuals]
+
+    def close(self):
+        pass
+
+
+class ThreadBackend:
+    """
+    ThreadBackend class that evaluates individuals on a pool of threads sharing the calling process. Individuals are not
+    copied, but the threads only run in parallel while NumPy has released the GIL.
+
+    Attributes:
+        evaluate (function): fitness function of an individual
+        executor (ThreadPoolExecutor): pool of evaluation threads
+    """
+
+    def __init__(self, evaluate, workers=None):
+        """
+        Constructor for the ThreadBackend class
+
+        :param evaluate (function): fitness function of an individual
+        :param workers (int): number of threads, the number of CPUs if not given
+        """
+        self.evaluate = evaluate
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def map(self, individuals):
+        """
+        Method to evaluate individuals
+
+        :param individuals (list): individuals to evaluate
+        :return: list of fitness tuples, in the order of the individuals
+        """
+        return list(self.executor.map(self.evaluate, individuals))
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class ProcessBackend:
+    """
+    ProcessBackend class that evaluates individuals on a pool of worker processes. Workers are sent only the TREE_RECORD
+    records of each layout, a few bytes per tree, instead of the pickled individual, and rebuild it in a grid of their own.
+    The scenario constraints are sent once when a worker starts.
+
+    Attributes:
+        pool (multiprocessing.Pool): pool of evaluation processes
+        chunksize (int): number of layouts sent to a worker at a time
+    """
+
+    def __init__(self, fitness_eval, x, y, scenario, workers=None, chunksize=16):
+        """
+        Constructor for the ProcessBackend class
+
+        :param fitness_eval: scenario constraints object whose evaluate method gives the fitness
+        :param x (int): x dimension of the grid
+        :param y (int): y dimension of the grid
+        :param scenario (int): scenario of the grid
+        :param workers (int): number of processes, the number of CPUs if not given
+        :param chunksize (int): number of layouts sent to a worker at a time
+        """
+        self.pool = multiprocessing.Pool(workers or os.cpu_count(), initializer=init_worker,
+                                         initargs=(fitness_eval, x, y, scenario))
+        self.chunksize = chunksize
+
+    def map(self, individuals):
+        """
+        Method to evaluate individuals
+
+        :param individuals (list): individuals to evaluate
+        :return: list of fitness tuples, in the order of the individuals
+        """
+        return self.pool.map(evaluate_records, [individual.grid.records() for individual in individuals], self.chunksize)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def create_backend(kind, fitness_eval, x, y, scenario, workers=None, chunksize=16):
+    """
+    Method to create the evaluation backend of a run
+
+    :param kind (string): "serial", "thread" or "process"
+    :param fitness_eval: scenario constraints object whose evaluate method gives the fitness
+    :param x (int): x dimension of the grid
+    :param y (int): y dimension of the grid
+    :param scenario (int): scenario of the grid
+    :param workers (int): number of threads or processes, the number of CPUs if not given
+    :param chunksize (int): number of layouts sent to a worker process at a time
+    :return: backend object with map and close methods
+    """
+    if kind == "serial":
+        return SerialBackend(fitness_eval.evaluate)
+    if kind == "thread":
+        return ThreadBackend(fitness_eval.evaluate, workers)
+    if kind == "process":
+        return ProcessBackend(fitness_eval, x, y, scenario, workers, chunksize)
+    raise ValueError("evaluation backend must be serial, thread or process, not " + str(kind))
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """
+    FitnessCache class that puts a bounded least recently used cache of fitness values in front of an evaluation backend, keyed
+    by the layout hash of an individual's grid. Individuals that hold the same trees, such as copies picked more than once by the
+    tournament or a mutation that was overlaid and then reverted, are only evaluated once. The number of hits and misses is
+    counted so it can be reported every generation.
+
+    Attributes:
+        backend: evaluation backend whose map method gives the fitness of a list of individuals
+        maxsize (int): largest number of fitness values kept
+        cache (OrderedDict): (layout hash, number of trees) -> fitness, least recently used first
+        hits (int): number of fitness values found in the cache since the counts were last reset
+        misses (int): number of fitness values evaluated since the counts were last reset
+    """
+
+    def __init__(self, backend, maxsize=4096):
+        """
+        Constructor for the FitnessCache class
+
+        :param backend: evaluation backend whose map method gives the fitness of a list of individuals
+        :param maxsize (int): largest number of fitness values kept
+        """
+        self.backend = backend
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, individual):
+        """
+        Method to get the fitness of an individual, from the cache if a grid with the same trees was evaluated before
+
+        :param individual (Individual): chromosome to evaluate
+        :return: fitness tuple
+        """
+        return self.evaluate_all([individual])[0]
+
+    def evaluate_all(self, individuals):
+        """
+        Method to get the fitness of several individuals. The ones not in the cache are evaluated together by the backend, and
+        individuals holding the same trees are only evaluated once.
+
+        :param individuals (list): chromosomes to evaluate
+        :return: list of fitness tuples, in the order of the individuals
+        """
+        #the number of trees is part of the key to make a collision of two different layouts even less likely
+        keys = [(individual.grid.layout_hash, len(individual.grid.trees)) for individual in individuals]
+        found = {}
+        missing = {}
+        for key, individual in zip(keys, individuals):
+            if key in found or key in missing:
+                self.hits += 1
+            elif key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                found[key] = self.cache[key]
+            else:
+                self.misses += 1
+                missing[key] = individual
+
+        for key, fitness in zip(missing, self.backend.map(list(missing.values()))):
+            found[key] = fitness
+            self.cache[key] = fitness
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return [found[key] for key in keys]
+
+    def reset_counts(self):
+        """
+        Method to reset the hit and miss counts, such as at the end of a generation
+
+        :return: (hits, misses) counted before the reset
+        """
+        counts = self.hits, self.misses
+        self.hits = 0
+        self.misses = 0
+        return counts
@@ -1,4 +1,7 @@
 import random
+from collections import deque
+import numpy as np
+from Constraints.LayoutStatistics import zone_map
 random.seed(100)
 
 class GreedyInitGrid:
@@ -13,8 +16,16 @@ class GreedyInitGrid:
         generator (TreeGenerator): tree generator object to generate trees
         fitness_eval (Constraint): fitness evaluation object
         mutations (AlgorithmMutations): mutations object
+        rng (Random): random number generator the grid is populated with
+        np_rng (numpy Generator): generator seeded from rng, to draw the squares to plant on
     """
-    def __init__(self, x, y, individual, tree_types_dict, generator, fitness_eval, mutations):
+
+    #steps of the constraint repair before giving up on the grid
+    MAX_REPAIR_STEPS = 5000
+    #squares of a zone tried for one repair option before the next option is tried
+    MAX_SQUARE_TRIES = 64
+
+    def __init__(self, x, y, individual, tree_types_dict, generator, fitness_eval, mutations, rng=None):
         """
         Constructor for the GreedyInitGrid class.
 
@@ -25,6 +36,7 @@ class GreedyInitGrid:
         :param generator (TreeGenerator): tree generator object to generate trees
         :param fitness_eval (Constraint): fitness evaluation object
         :param mutations (AlgorithmMutations): mutations object
+        :param rng (Random): random number generator to populate the grid with, the shared random module if not given
         """
         self.x = x
         self.y = y
@@ -33,6 +45,8 @@ class GreedyInitGrid:
         self.generator = generator
         self.constraints = fitness_eval
         self.mutations = mutations
+        self.rng = rng if rng is not None else random
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
         #define trees to plant given constraint violated. These trees help to satisfy the constraint.
         self.violations_apartment =  {"min_trees_to_landscape": [1, 4, 6, 7, 21],
                             "min_evergreen_to_all": [1, 2, 3, 4, 5, 6],
@@ -42,8 +56,10 @@ class GreedyInitGrid:
                             "min_canopy_coverage": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21],
                             "min_evergreen_count": [1, 2, 3, 4, 5, 6],
                             "min_deciduous_count": [7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21],
+                            "road_side_planting": [13, 20],
                             "pedestrian_road_planting": [1, 2, 3, 4, 5, 6, 7, 21],
                             "hedge_planting": [1, 6],
+                            "min_co2": [0],
                             "total_cost": [0]
                            }
         self.areas =  {"hedge": [1, 6],
@@ -64,6 +80,190 @@ class GreedyInitGrid:
                                 "too_many_trees": [0]
                                 }
 
+    def sample_cells(self, layer, p):
+        """
+        Method to draw the squares of a zone that each get a tree with probability p, in row by row order. The squares of the
+        zone are looked up once per site, so this costs as much as the zone is large rather than the whole grid.
+
+        :param layer (string): zone layer of the site, such as hedge
+        :param p (float or numpy array): chance of each square being drawn, or an array of one chance per square of the zone
+        :return: (rows, columns) index arrays of the drawn squares
+        """
+        rows, cols = self.individual.grid.site.cells(layer)
+        drawn = self.np_rng.random(len(rows)) < p
+        return rows[drawn], cols[drawn]
+
+    def plant_cells(self, rows, cols, tree_types):
+        """
+        Method to plant trees on squares in order, skipping any that do not fit. A square drawn the None tree type, id 0, is
+        left empty.
+
+        :param rows (numpy array): y coordinates of the squares
+        :param cols (numpy array): x coordinates of the squares
+        :param tree_types (numpy array): tree type id to plant on each square
+        """
+        for i, j, tree_type in zip(rows.tolist(), cols.tolist(), tree_types.tolist()):
+            if tree_type != 0:
+                self.mutations.plant_tree(tree_type, j, i)
+
+    def populate_apartment_zones(self):
+        """
+        Method to plant the zones of the apartment complex before the constraints are checked: screening trees in the hedge,
+        any tree along the pedestrian roads, alternating native trees along the roads and large trees in the big tree area.
+        """
+        #must populate hedge with screening trees, so plant trees in hedge areas first. the upper hedge gets a tree on 2 in
+        #25 squares, the lower hedge on every square
+        rows, _ = self.individual.grid.site.cells("hedge")
+        rows, cols = self.sample_cells("hedge", np.where(rows < 350, 2 / 25, np.where(rows > 350, 1.0, 0.0)))
+        self.plant_cells(rows, cols, self.np_rng.choice(self.areas["hedge"], len(rows)))
+
+        #populate pedestrian road areas with trees, on every square drawn a tree type other than None
+        rows, cols = self.individual.grid.site.cells("pedestrian_road")
+        self.plant_cells(rows, cols, self.np_rng.choice(self.areas["plantable"], len(rows)))
+
+        #populate road areas with trees on 2 in 25 squares
+        rows, cols = self.sample_cells("road", 2 / 25)
+        #tree should flip back and forth between tree 13 and 20 to plant for aesthetic purposes
+        self.plant_cells(rows, cols, np.array(self.areas["native"])[rows % 2])
+
+        #populate big tree areas with large trees, on 1 in 30 squares of which 2 in 7 are skipped at random
+        rows, cols = self.sample_cells("big_tree_area", (1 / 30) * (5 / 7))
+        self.plant_cells(rows, cols, self.np_rng.choice(self.areas["big_tree_area"], len(rows)))
+
+    def satisfy_apartment_constraints(self):
+        """
+        Method to plant or remove trees until every constraint is met, driven by how far each constraint is from its bound.
+        Each step takes the violated constraint with the largest deficit relative to its bound. A minimum is repaired by
+        planting the tree type in the zone that reduces the deficit most per unit of price, preferring ones that do not
+        violate a constraint that is met. A maximum is repaired by removing the tree that reduces the excess most. The
+        constraints are checked against the running statistics of the grid, so a step costs O(species), not a grid scan, and
+        only a grid that looks valid is checked against the exact statistics.
+
+        :return (Individual): individual object with populated grid, or None if the constraints could not be met
+        """
+        grid = self.individual.grid
+        engine = self.constraints.engine
+        constraints = {constraint.name: constraint for constraint in engine.constraints}
+        zones = zone_map(grid.site)
+        #plantable squares of each zone in random order, taken from the end as trees are planted in the zone
+        queues = []
+        for zone in range(grid.stats.counts.shape[0]):
+            rows, cols = np.nonzero((zones == zone) & grid.site.plantable)
+            order = self.np_rng.permutation(len(rows))
+            queues.append(deque(zip(rows[order].tolist(), cols[order].tolist())))
+
+        for _ in range(self.MAX_REPAIR_STEPS):
+            result = engine.check(grid, all_slack=True)
+            if result.violation is None:
+                #the quick statistics can differ in the last bit from the exact ones fitness is taken from, so confirm
+                result = engine.check(grid, all_slack=True, exact=True)
+            if result.violation is None:
+                self.constraints.validate(grid)
+                return self.individual #all constraints are met return and use initial grid for genetic algorithm
+
+            #repair the violated constraint that is furthest from its bound, relative to the bound
+            violated = [name for name, slack in result.slack.items() if slack < 0]
+            name = max(violated, key=lambda name: -result.slack[name] / max(abs(result.bounds[name]), 1))
+            if constraints[name].kind == "max":
+                if not self.remove_for(constraints[name], result, zones):
+                    return None
+            elif not self.plant_for(constraints[name], result, violated, queues):
+                return None
+        return None #not satisfied with constraints, try again
+
+    def plant_for(self, constraint, result, violated, queues):
+        """
+        Method to plant the tree that reduces the deficit of a minimum constraint most per unit of price. If the tree of the
+        best option cannot be planted in its zone, the next best option is planted instead.
+
+        :param constraint (Constraint): violated minimum constraint
+        :param result (ConstraintResult): check of the grid with the slack of every constraint
+        :param violated (list): names of the violated constraints
+        :param queues (list): remaining squares of each zone to plant on
+        :return: false if no tree type that reduces the deficit could be planted in its zone
+        """
+        catalog = self.constraints.catalog
+        #tree types known to help with the constraint, or every tree type of the site if none are listed
+        species_ids = [i for i in self.violations_apartment.get(constraint.name, []) if i != 0 and i in self.tree_types_dict]
+        species_ids = species_ids or [i for i in self.tree_types_dict if i != 0]
+
+        options = []
+        for zone, queue in enumerate(queues):
+            if not queue:
+                continue
+            for species in species_ids:
+                trial = result.stats.copy()
+                trial.adjust(zone, species, 1)
+                gain = constraint.check(trial)[1] - result.slack[constraint.name]
+                if gain > 0:
+                    options.append((gain / max(catalog.price[species].item(), 1), zone, species, trial))
+        if not options:
+            return False
+
+        options.sort(key=lambda option: option[0], reverse=True)
+        satisfied = [other for other in self.constraints.engine.constraints if other.name not in violated]
+        #the best option that keeps every met constraint met goes first, then the rest by gain per unit of price
+        first = next((option for option in options if not any(other.check(option[3])[0] for other in satisfied)), options[0])
+        for _, zone, species, _ in [first] + [option for option in options if option is not first]:
+            if self.plant_in_zone(species, zone, queues[zone]):
+                return True
+        return False
+
+    def plant_in_zone(self, species, zone, queue):
+        """
+        Method to plant a tree with its base in a zone, on one of at most MAX_SQUARE_TRIES squares taken from the end of the
+        queue of the zone. Occupied squares are dropped from the queue, and free squares the tree does not fit on are put back
+        at its front, as a smaller tree may still fit there. A tree the local search moves out of the zone is taken out again,
+        as it would not reduce the deficit the option was chosen for.
+
+        :param species (int): tree type id to plant
+        :param zone (int): ZONE_ value the tree base must be in
+        :param queue (deque): remaining squares of the zone to plant on
+        :return: true if the tree was planted in the zone
+        """
+        grid = self.individual.grid
+        unused = []
+        planted = False
+        for _ in range(min(self.MAX_SQUARE_TRIES, len(queue))):
+            i, j = queue.pop()
+            if not grid.is_free(j, i):
+                continue
+            planted_before = int(grid.stats.counts[zone, species])
+            with grid.transact() as transaction:
+                if self.mutations.plant_tree(species, j, i):
+                    planted = grid.stats.counts[zone, species] > planted_before
+                    if not planted:
+                        transaction.rollback()
+            if planted:
+                break
+            unused.append((i, j))
+        queue.extendleft(unused)
+        return planted
+
+    def remove_for(self, constraint, result, zones):
+        """
+        Method to remove the tree that reduces the excess of a maximum constraint most
+
+        :param constraint (Constraint): violated maximum constraint
+        :param result (ConstraintResult): check of the grid with the slack of every constraint
+        :param zones (numpy array): zone of each square, from zone_map
+        :return: false if removing no tree reduces the excess
+        """
+        best_gain, best = 0, None
+        for zone, species in zip(*np.nonzero(result.stats.counts)):
+            trial = result.stats.copy()
+            trial.adjust(zone, species, -1)
+            gain = constraint.check(trial)[1] - result.slack[constraint.name]
+            if gain > best_gain:
+                best_gain, best = gain, (zone, species)
+        if best is None:
+            return False
+
+        zone, species = best
+        bases = [(x, y) for (x, y), planted in self.individual.grid.trees.items() if planted == species and zones[y, x] == zone]
+        self.mutations.remove_tree(*self.rng.choice(bases))
+        return True
+
     def init_grid_scenario_one(self):
         """
         Method to initialize the grid with trees for scenario one. This is a greedy algorithm that populates the grid with trees based on the constraints violated.
@@ -71,79 +271,8 @@ class GreedyInitGrid:
 
         :return (Individual): individual object with populated grid
         """
-        #must populate hedge with screening trees, so plant trees in hedge areas first
-
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].hedge:
-                    chance = random.randint(1, 25)
-                    if i < 350 and chance < 3:
-                        tree_type = random.choice(self.areas["hedge"])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    elif i > 350:
-                        tree_type = random.choice(self.areas["hedge"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        #populate road areas with trees. set interval to 2 meters - meaning set additional 4 blocks up, down, left, right to be unplantable
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].pedestrian_road:
-                    chance = random.randint(1, 10)
-                    if i < 322 and chance < 4:
-                        tree_type = random.choice(self.areas["plantable"])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        tree_type = random.choice(self.areas["plantable"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-
-        #populate road areas with trees. set interval to 2 meters - meaning set additional 4 blocks up, down, left, right to be unplantable
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].road:
-                    #tree should flip back and forth between tree 13 and 20 to plant for aesthetic purposes
-                    chance = random.randint(1, 25)
-                    if chance < 3:
-                        tree_type = self.areas["native"][i % 2]
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        #populate big tree areas with large trees
-        for i in range(self.y):
-            for j in range(self.x):
-                chance = random.randint(1, 30)
-                if chance < 2:
-                    if self.individual.grid.grid[i][j].big_tree_area:
-                        #random chance to plant a tree in big tree area
-                        chance = random.choice([1, 2, 3, 4, 5, 6, 7])
-                        if chance < 3: continue #random chance to not plant tree
-                        tree_type = random.choice(self.areas["big_tree_area"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].pedestrian_road:
-                    constraint = self.constraints.validate(self.individual.grid.numerical_grid.flatten())
-                    if constraint == None: return self.individual #all constraints are met return and use initial grid for genetic algorithm
-                    if constraint == "pedestrian_road_planting":
-                        tree_type = random.choice([1, 2, 3, 4, 5, 6, 7, 21])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        tree_type = random.choice(self.violations_apartment[constraint])
-                        self.mutations.plant_tree(tree_type, j, i)
-                chance = random.randint(1, 40)
-                if chance < 2:
-                    #check fitness_eval to see what constraint is being violated
-                    if self.individual.grid.grid[i][j].plantable:
-                        #which constraint is being violated?
-                        flatten_grid = self.individual.grid.numerical_grid.flatten()
-                        constraint = self.constraints.validate(flatten_grid)
-                        if constraint == None: return self.individual #all constraints are met return and use initial grid for genetic algorithm
-                        tree_type = random.choice(self.violations_apartment[constraint])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        pass
-        return None #not satisfied with constraints, try again
-
+        self.populate_apartment_zones()
+        return self.satisfy_apartment_constraints()
 
     def init_grid_scenario_two(self):
         """
@@ -152,78 +281,8 @@ class GreedyInitGrid:
 
         :return: Individual object with populated grid
         """
-        #must populate hedge with screening trees, so plant trees in hedge areas first
-
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].hedge:
-                    chance = random.randint(1, 25)
-                    if i < 350 and chance < 3:
-                        tree_type = random.choice(self.areas["hedge"])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    elif i > 350:
-                        tree_type = random.choice(self.areas["hedge"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        #populate road areas with trees. set interval to 2 meters - meaning set additional 4 blocks up, down, left, right to be unplantable
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].pedestrian_road:
-                    chance = random.randint(1, 10)
-                    if i < 322 and chance < 4:
-                        tree_type = random.choice(self.areas["plantable"])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        tree_type = random.choice(self.areas["plantable"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-
-        #populate road areas with trees. set interval to 2 meters - meaning set additional 4 blocks up, down, left, right to be unplantable
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].road:
-                    #tree should flip back and forth between tree 13 and 20 to plant for aesthetic purposes
-                    chance = random.randint(1, 25)
-                    if chance < 3:
-                        tree_type = self.areas["native"][i % 2]
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        #populate big tree areas with large trees
-        for i in range(self.y):
-            for j in range(self.x):
-                chance = random.randint(1, 30)
-                if chance < 2:
-                    if self.individual.grid.grid[i][j].big_tree_area:
-                        #random chance to plant a tree in big tree area
-                        chance = random.choice([1, 2, 3, 4, 5, 6, 7])
-                        if chance < 3: continue #random chance to not plant tree
-                        tree_type = random.choice(self.areas["big_tree_area"])
-                        self.mutations.plant_tree(tree_type, j, i)
-
-        for i in range(self.y):
-            for j in range(self.x):
-                if self.individual.grid.grid[i][j].pedestrian_road:
-                    constraint = self.constraints.validate(self.individual.grid.numerical_grid.flatten())
-                    if constraint == None: return self.individual #all constraints are met return and use initial grid for genetic algorithm
-                    if constraint == "pedestrian_road_planting":
-                        tree_type = random.choice([1, 2, 3, 4, 5, 6, 7, 21])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        tree_type = random.choice(self.violations_apartment[constraint])
-                        self.mutations.plant_tree(tree_type, j, i)
-                chance = random.randint(1, 40)
-                if chance < 2:
-                    #check fitness_eval to see what constraint is being violated
-                    if self.individual.grid.grid[i][j].plantable:
-                        #which constraint is being violated?
-                        flatten_grid = self.individual.grid.numerical_grid.flatten()
-                        constraint = self.constraints.validate(flatten_grid)
-                        if constraint == None: return self.individual #all constraints are met return and use initial grid for genetic algorithm
-                        tree_type = random.choice(self.violations_apartment[constraint])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        pass
-        return None #not satisfied with constraints, try again
+        self.populate_apartment_zones()
+        return self.satisfy_apartment_constraints()
 
     def init_grid_edinburgh(self):
         """
@@ -232,22 +291,15 @@ class GreedyInitGrid:
 
         :return: Individual object with populated grid
         """
-        for i in range(self.y):
-            for j in range(self.x):
-                #random chance to plot a tree
-                chance = random.randint(1, 1000)
-                if chance < 4:
-                    #check fitness_eval to see what constraint is being violated
-                    if self.individual.grid.grid[i][j].plantable:
-                        #which constraint is being violated?
-                        flatten_grid = self.individual.grid.numerical_grid.flatten()
-                        constraint = self.constraints.validate(flatten_grid)
-                        if constraint == None:
-                            return self.individual #all constraints are met return and use initial grid for genetic algorithm
-                        tree_type = random.choice(self.violations_park[constraint])
-                        self.mutations.plant_tree(tree_type, j, i)
-                    else:
-                        pass
+        #random chance to plot a tree on 3 in 1000 plantable squares
+        rows, cols = self.sample_cells("plantable", 3 / 1000)
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            #check fitness_eval to see what constraint is being violated
+            if self.individual.grid.is_free(j, i):
+                #which constraint is being violated?
+                constraint = self.constraints.validate(self.individual.grid)
+                if constraint == None:
+                    return self.individual #all constraints are met return and use initial grid for genetic algorithm
+                tree_type = self.rng.choice(self.violations_park[constraint])
+                self.mutations.plant_tree(tree_type, j, i)
         return None #not satisfied with constraints, try again
-
-
@@ -0,0 +1,78 @@
+import random
+import numpy as np
+from Environment.Grid import Grid
+from GeneticAlgorithm.AlgorithmMutations import AlgorithmMutations
+from GeneticAlgorithm.EvaluationBackend import Layout
+from GeneticAlgorithm.GreedyInitGrid import GreedyInitGrid
+
+#greedy attempts made for one individual before giving up on it
+MAX_ATTEMPTS = 650
+
+#state of an initialisation worker process, set up once by init_worker
+_worker_state = None
+
+
+def individual_seeds(seed, count):
+    """
+    Method to get an independent random seed for each individual of a population. The seeds are spawned from one seed, so
+    individual i always gets the same random stream however many workers build the population and in whatever order.
+
+    :param seed (int): seed of the population
+    :param count (int): number of individuals
+    :return: list of int seeds
+    """
+    return [int.from_bytes(child.generate_state(4).tobytes(), "little")
+            for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+def greedy_layout(x, y, scenario, trees_types_dict, generator, fitness_eval, method, rng, arena=None):
+    """
+    Method to populate a grid with the greedy algorithm, retrying on a fresh grid until it satisfies the constraints or
+    MAX_ATTEMPTS attempts have been made
+
+    :param x (int): x dimension of the grid
+    :param y (int): y dimension of the grid
+    :param scenario (int): scenario of the grid
+    :param trees_types_dict (dict): of tree types id to species
+    :param generator (TreeGenerator): TreeGenerator object to generate trees
+    :param fitness_eval: scenario constraints object to validate the grid with
+    :param method (string): GreedyInitGrid method of the scenario, such as init_grid_edinburgh
+    :param rng (Random): random number generator of the individual
+    :param arena (PopulationArena): optional shared store for the numerical grids
+    :return: (grid, attempts), grid is None if no attempt satisfied the constraints
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        layout = Layout(Grid(x, y, scenario, arena))
+        mutations = AlgorithmMutations(trees_types_dict, layout.grid)
+        greedy_alg = GreedyInitGrid(x, y, layout, trees_types_dict, generator, fitness_eval, mutations, rng)
+        if getattr(greedy_alg, method)() is not None:
+            return layout.grid, attempt
+    return None, MAX_ATTEMPTS
+
+
+def init_worker(x, y, scenario, trees_types_dict, generator, fitness_eval, method):
+    """
+    Method to set up an initialisation worker process with everything greedy_layout needs besides the random stream
+
+    :param x (int): x dimension of the grid
+    :param y (int): y dimension of the grid
+    :param scenario (int): scenario of the grid
+    :param trees_types_dict (dict): of tree types id to species
+    :param generator (TreeGenerator): TreeGenerator object to generate trees
+    :param fitness_eval: scenario constraints object to validate the grid with
+    :param method (string): GreedyInitGrid method of the scenario
+    """
+    global _worker_state
+    _worker_state = (x, y, scenario, trees_types_dict, generator, fitness_eval, method)
+
+
+def build_layout(task):
+    """
+    Method to build one individual in an initialisation worker. Only its TREE_RECORD records are sent back.
+
+    :param task (int, int): index of the individual and its seed
+    :return: (index, attempts, records), records is None if no attempt satisfied the constraints
+    """
+    index, seed = task
+    grid, attempts = greedy_layout(*_worker_state, random.Random(seed))
+    return index, attempts, None if grid is None else grid.records()
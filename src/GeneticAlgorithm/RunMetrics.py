@@ -0,0 +1,113 @@
+import csv
+import json
+import os
+import numpy as np
+
+
+def generation_metrics(generation, offspring, engine, best, timings, cache_counts):
+    """
+    Method to summarise one generation of a run. Every offspring is checked against all the constraints of the scenario,
+    with the same exact statistics its fitness is taken from, to count how many violate each one.
+
+    :param generation (int): generation number
+    :param offspring (list): evaluated offspring of the generation
+    :param engine (ConstraintEngine): constraints of the scenario
+    :param best (function): min or max, whichever picks the best of the fitness values
+    :param timings (dict): phase name -> seconds spent on it in the generation
+    :param cache_counts (int, int): fitness cache hits and misses of the generation
+    :return: dict of metric name -> value, with one violated_<constraint> count per constraint
+    """
+    scores = np.array([individual.fitness.values[0] for individual in offspring], dtype=np.float64)
+    violated = dict.fromkeys((constraint.name for constraint in engine.constraints), 0)
+    feasible = 0
+    for individual in offspring:
+        result = engine.check(individual.grid, all_slack=True, exact=True)
+        feasible += result.violation is None
+        for name, slack in result.slack.items():
+            violated[name] += slack < 0
+    layouts = {(individual.grid.layout_hash, len(individual.grid.trees)) for individual in offspring}
+
+    metrics = {
+        "generation": generation,
+        "best": best(scores.tolist()),
+        "mean": float(scores.mean()),
+        "median": float(np.median(scores)),
+        "feasible_fraction": feasible / len(offspring),
+        "unique_layouts": len(layouts),
+        "cache_hits": cache_counts[0],
+        "cache_misses": cache_counts[1],
+    }
+    for phase, seconds in timings.items():
+        metrics[phase + "_seconds"] = round(seconds, 6)
+    for name, count in violated.items():
+        metrics["violated_" + name] = count
+    return metrics
+
+
+class MetricsWriter:
+    """
+    MetricsWriter class that streams the metrics of every generation of a run to a file, one record per generation, flushed
+    as soon as it is written so the run can be followed while it goes. A path ending in .csv is written as CSV with a header
+    row, any other path as JSON lines. A resumed run keeps the records already in the file up to the generation it resumes
+    after, and drops the later ones it is about to run again.
+
+    Attributes:
+        file: open metrics file
+        is_csv (bool): true if the file is written as CSV
+        csv_writer (csv.DictWriter): writer of the CSV rows, created with the first row
+    """
+
+    def __init__(self, path, keep_until=None):
+        """
+        Constructor for the MetricsWriter class
+
+        :param path (string): metrics file
+        :param keep_until (int): last generation whose records already in the file are kept, such as the generation of the
+        checkpoint a run resumes from, or None to start the file over
+        """
+        self.is_csv = path.endswith(".csv")
+        self.csv_writer = None
+        if keep_until is not None and os.path.exists(path):
+            self.truncate(path, keep_until)
+            self.file = open(path, "a", newline="")
+        else:
+            self.file = open(path, "w", newline="")
+
+    def truncate(self, path, keep_until):
+        """
+        Method to drop the records of a metrics file after a generation, and any record left half written
+
+        :param path (string): metrics file
+        :param keep_until (int): last generation to keep
+        """
+        with open(path, newline="") as f:
+            lines = [line for line in f if line.endswith("\n")]
+        if self.is_csv:
+            rows = list(csv.reader(lines))
+            column = rows[0].index("generation") if rows else 0
+            lines = rows[:1] + [row for row in rows[1:] if int(row[column]) <= keep_until]
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerows(lines)
+        else:
+            lines = [line for line in lines if json.loads(line)["generation"] <= keep_until]
+            with open(path, "w", newline="") as f:
+                f.writelines(lines)
+
+    def write(self, metrics):
+        """
+        Method to write the metrics of a generation
+
+        :param metrics (dict): metric name -> value, with the same names every generation
+        """
+        if self.is_csv:
+            if self.csv_writer is None:
+                self.csv_writer = csv.DictWriter(self.file, fieldnames=list(metrics))
+                if self.file.tell() == 0:
+                    self.csv_writer.writeheader()
+            self.csv_writer.writerow(metrics)
+        else:
+            self.file.write(json.dumps(metrics) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
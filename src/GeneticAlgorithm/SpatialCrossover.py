@@ -0,0 +1,76 @@
+import numpy as np
+from Constraints.LayoutStatistics import zone_map
+from GeneticAlgorithm.AlgorithmMutations import AlgorithmMutations
+from Trees.TreeSpacing import TreeSpacing
+
+#crossover operators mate can pick from, by name
+CROSSOVER_OPERATORS = ("block", "zone")
+
+
+def block_region(x, y, rng):
+    """
+    Method to pick a random rectangle of the site for 2D block crossover
+
+    :param x (int): x dimension of the grid
+    :param y (int): y dimension of the grid
+    :param rng (Random): random number generator
+    :return: function of an array of TREE_RECORD records -> boolean numpy array, true for the trees based in the rectangle
+    """
+    left = rng.randrange(x)
+    right = rng.randint(left + 1, x)
+    top = rng.randrange(y)
+    bottom = rng.randint(top + 1, y)
+
+    def inside(records):
+        return (records["x"] >= left) & (records["x"] < right) & (records["y"] >= top) & (records["y"] < bottom)
+    return inside
+
+
+def zone_region(site, rng):
+    """
+    Method to pick a random set of the zones the constraints count trees in for zone crossover, such as the hedge and the
+    pedestrian road. Each zone of the site is picked with probability one half.
+
+    :param site (Site): site of the grids
+    :param rng (Random): random number generator
+    :return: function of an array of TREE_RECORD records -> boolean numpy array, true for the trees based in the zones, or None
+    if the site has a single zone
+    """
+    zones = zone_map(site)
+    present = np.unique(zones)
+    if len(present) < 2:
+        return None
+    chosen = [zone for zone in present.tolist() if rng.random() < 0.5]
+
+    def inside(records):
+        return np.isin(zones[records["y"], records["x"]], chosen)
+    return inside
+
+
+def exchange_trees(records, donor_records, inside, grid, tree_types_dict):
+    """
+    Method to build an offspring grid from the trees of a parent outside a region and the trees of the other parent inside
+    it. Both parents are valid layouts, so a tree can only clash with another across the edge of the region. Every incoming
+    tree is tested against the kept trees at once, the ones that fit are planted as they are, and only the clashing ones at
+    the seam are replanted one by one, moving them to the nearest position they fit in or dropping them.
+
+    :param records (numpy array): TREE_RECORD records of the parent whose trees outside the region are kept
+    :param donor_records (numpy array): TREE_RECORD records of the parent whose trees inside the region are taken
+    :param inside (function): function of records -> boolean numpy array of the trees based in the region
+    :param grid (Grid): empty grid of the offspring
+    :param tree_types_dict (dict): of tree types id to species
+    """
+    incoming = donor_records[inside(donor_records)]
+    grid.load_records(records[~inside(records)])
+
+    radii = grid.catalog.radius[incoming["species"]]
+    fits = np.zeros(len(incoming), dtype=bool)
+    spacing = TreeSpacing(tree_types_dict)
+    for radius in np.unique(radii).tolist():
+        same = radii == radius
+        fits[same] = spacing.fits_many(radius, incoming["x"][same], incoming["y"][same], grid.numerical_grid, grid)
+    grid.add_records(incoming[fits])
+
+    mutations = AlgorithmMutations(tree_types_dict, grid)
+    for x, y, tree_type in incoming[~fits].tolist():
+        mutations.plant_tree(tree_type, x, y)
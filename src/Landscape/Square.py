@@ -1,32 +1,55 @@
 class Square:
     """
-    Square class which represents a 1-meter by 1-meter square in a grid. The grid is a 2D array of squares that
-    resembles the environment.
+    Square class which represents a 1-meter by 1-meter square in a grid. A square is a lightweight view onto a Grid object:
+    the zone flags are read from the static layers of the shared site, and the tree is read from the grid planting state.
+    Squares are created on demand, so holding on to one does not keep any state of its own.
 
     Attributes:
+        env (Grid): grid object the square belongs to
         x (int): x-coordinate of the square
         y (int): y-coordinate of the square
-        tree (int): tree object planted on the square
-        road (bool): boolean to check if the square is by a road
     """
 
-    def __init__(self, x, y, by_road, plantable, hedge, big_tree_area, pedestrian_road):
+    __slots__ = ("env", "x", "y")
+
+    def __init__(self, env, x, y):
         """
         Constructor for the Square class
 
+        :param env (Grid): grid object the square belongs to
         :param x (int): x coordinate in grid
         :param y (int): y coordinate in grid
-        :param byRoad (bool): boolean to check if square is by a road
-        :param plantable (bool): boolean to check if square is plantable
         """
+        self.env = env
         self.x = x
         self.y = y
-        self.tree = None
-        self.road = by_road
-        self.plantable = plantable
-        self.hedge = hedge
-        self.big_tree_area = big_tree_area
-        self.pedestrian_road = pedestrian_road
+
+    @property
+    def road(self):
+        return bool(self.env.site.road[self.y, self.x])
+
+    @property
+    def plantable(self):
+        return bool(self.env.site.plantable[self.y, self.x])
+
+    @property
+    def hedge(self):
+        return bool(self.env.site.hedge[self.y, self.x])
+
+    @property
+    def big_tree_area(self):
+        return bool(self.env.site.big_tree_area[self.y, self.x])
+
+    @property
+    def pedestrian_road(self):
+        return bool(self.env.site.pedestrian_road[self.y, self.x])
+
+    @property
+    def tree(self):
+        base = self.env.tree_at(self.x, self.y)
+        if base is None:
+            return None
+        return self.env.make_tree(*base)
 
     def get_coordinates(self):
         """
@@ -38,14 +61,14 @@ class Square:
 
     def plant(self, tree):
         """
-        Method to plant a tree on a square
+        Method to plant a tree on a square. Planting only changes the planting state of the grid, never the static layers.
 
         :return: true if tree is planted, false otherwise
         """
         if self.plantable:
-            self.tree = tree
-            self.plantable = False
-        else: return False
+            self.env.plant(self.x, self.y, tree)
+            return True
+        return False
 
     def check_near_squares(self, radius):
         """
@@ -71,9 +94,7 @@ class Square:
 
         :return: true if square is plantable, false otherwise
         """
-        if self.plantable:
-            return True
-        return False
+        return self.plantable
 
     def tree_obj(self):
         return self.tree
@@ -108,18 +129,66 @@ class Square:
 
         :return: the numeric representation of the square
         """
-        if self.tree:
-            if self.tree.numericalRepresentation == 0: return -2
-            return self.tree.numericalRepresentation
+        tree = self.tree
+        if tree:
+            if tree.getNumericalRepresentation() == 0: return -2
+            return tree.getNumericalRepresentation()
         elif not self.plantable:
             return -1
         else:
             return 0
 
-    def get_coordinates(self):
+
+class SquareGrid:
+    """
+    Read-only 2D view of Square objects over a Grid object. This keeps grid[y][x] and grid[y, x] style access working
+    without storing a Square object per cell.
+
+    Attributes:
+        env (Grid): grid object to view
+    """
+
+    def __init__(self, env):
         """
-        Method to get the coordinates of a square
+        Constructor for the SquareGrid class
 
-        :return: tuple of x and y coordinates
+        :param env (Grid): grid object to view
+        """
+        self.env = env
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            y, x = index
+            return Square(self.env, x, y)
+        return SquareRow(self.env, index)
+
+    def __len__(self):
+        return self.env.y
+
+
+class SquareRow:
+    """
+    Read-only view of one row of Square objects, returned by SquareGrid when indexed by row only.
+
+    Attributes:
+        env (Grid): grid object to view
+        y (int): row of the view
+    """
+
+    __slots__ = ("env", "y")
+
+    def __init__(self, env, y):
         """
-        return self.x, self.y
\ No newline at end of file
+        Constructor for the SquareRow class
+
+        :param env (Grid): grid object to view
+        :param y (int): row of the view
+        """
+        self.env = env
+        self.y = y
+
+    def __getitem__(self, x):
+        return Square(self.env, x, self.y)
+
+    def __len__(self):
+        return self.env.x
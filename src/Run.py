@@ -1,5 +1,6 @@
 from matplotlib.colors import ListedColormap, BoundaryNorm
 from Environment.Grid import Grid
+from Trees.SpeciesCatalog import SpeciesCatalog
 from Trees.TreeGenerator import TreeGenerator
 from GeneticAlgorithm.CustomGeneticChanges import CustomGeneticChanges
 import numpy as np
@@ -9,50 +10,10 @@ def main():
     """
     This function is used to run the genetic algorithm and display the results. It will also display the grid with the trees
     """
-    tree_types_dict = {
-        0: "None",
-        1: "Abies Holophylla",
-        2: "Pinus Desniflora1",
-        3: "Pinus Desniflora2",
-        4: "Pinus Desniflora Globosa",
-        5: "Taxus Cuspidata",
-        6: "White Pine",
-        7: "Acer Palmatum",
-        8: "Betula Platyphylla",
-        9: "Cercidiphyllum Japonicum",
-        10: "Chaenomeless Sinensis",
-        11: "Chionanthus Retusus",
-        12: "Cornus Officinalis",
-        13: "Ginkgo Biloba",
-        14: "Kobus Magnolia",
-        15: "Liriodendron Tulipifera",
-        16: "Oak",
-        17: "Persimmon",
-        18: "Prunus Armeniaca",
-        19: "Prunus Yedoensis",
-        20: "Sophora Japonica",
-        21: "Zelkova Serrata"
-    }
-
-    tree_types_edi_dict = {
-        0: "None",
-        1: "Abies Holophylla",
-        5: "Taxus Cuspidata",
-        6: "White Pine",
-        7: "Acer Palmatum",
-        8: "Betula Platyphylla",
-        9: "Cercidiphyllum Japonicum",
-        11: "Chionanthus Retusus",
-        12: "Cornus Officinalis",
-        13: "Ginkgo Biloba",
-        14: "Kobus Magnolia",
-        15: "Liriodendron Tulipifera",
-        16: "Oak",
-        17: "Persimmon",
-        18: "Prunus Armeniaca",
-        20: "Sophora Japonica",
-        21: "Zelkova Serrata"
-    }
+    #tree types of number -> tree type, and the subset planted in the Sundial Garden
+    catalog = SpeciesCatalog.load()
+    tree_types_dict = catalog.types_dict()
+    tree_types_edi_dict = catalog.types_dict(catalog.site_mask("park"))
 
     #create tree generator
     generator = TreeGenerator()
@@ -77,15 +38,15 @@ def main():
         for j in range(x):
             if j > 316:
                 numerical_grid[i][j] = 2
-            if env.grid[i][j].hedge:
+            if env.site.hedge[i, j]:
                 numerical_grid[i][j] = 2
-            elif env.grid[i][j].big_tree_area:
+            elif env.site.big_tree_area[i, j]:
                 numerical_grid[i][j] = 3
-            elif env.grid[i][j].road:
+            elif env.site.road[i, j]:
                 numerical_grid[i][j] = 4
-            elif env.grid[i][j].pedestrian_road:
+            elif env.site.pedestrian_road[i, j]:
                 numerical_grid[i][j] = 5
-            elif env.grid[i][j].plantable:
+            elif env.site.plantable[i, j]:
                 numerical_grid[i][j] = 1
             else:
                 numerical_grid[i][j] = 0
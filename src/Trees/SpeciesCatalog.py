@@ -0,0 +1,123 @@
+import csv
+import math
+import os
+import numpy as np
+
+TREES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SpeciesCatalog:
+    """
+    SpeciesCatalog class holding the attributes of every tree type as parallel NumPy arrays indexed by tree type id. The
+    catalog is loaded once from a CSV data file and shared, so looking up the price or CO2 absorption of a planted tree is an
+    array index rather than building a Tree object. The species planted on a site are listed in the sites column of the data
+    file and are exposed as boolean id masks.
+
+    Attributes:
+        names (list): tree type id -> name used in the tree types dictionaries
+        ids (dict): name -> tree type id
+        species (numpy array): species name of each tree type
+        leaf_type (numpy array): leaf type of each tree type, Evergreen or Deciduous
+        tree_category (numpy array): category of each tree type, Screen, Large, Native or None
+        height (numpy array): height of each tree type
+        width (numpy array): crown width of each tree type
+        root_diameter (numpy array): root diameter of each tree type
+        plant_size (numpy array): (height, width, root diameter) rows of each tree type
+        credit_value (numpy array): credit value of each tree type
+        crown_area (numpy array): crown area of each tree type
+        co2_absorption (numpy array): CO2 absorbed by each tree type
+        price (numpy array): price of each tree type
+        radius (numpy array): footprint radius of each tree type, in squares
+        evergreen, deciduous, large, native (numpy array): boolean masks of tree types by leaf type and category
+        site_masks (dict): site name -> boolean mask of the tree types planted on that site
+    """
+
+    DATA_FILE = os.path.join(TREES_DIR, "species.csv")
+
+    # catalogs already loaded in this process, keyed by data file
+    _loaded = {}
+
+    def __init__(self, rows):
+        """
+        Constructor for the SpeciesCatalog class
+
+        :param rows (list): dicts of column name -> value, one per tree type, with ids 0 to n - 1
+        """
+        rows = sorted(rows, key=lambda row: int(row["id"]))
+        if [int(row["id"]) for row in rows] != list(range(len(rows))):
+            raise ValueError("tree type ids must run from 0 without gaps")
+
+        self.names = [row["name"] for row in rows]
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.species = np.array([row["species"] for row in rows], dtype=object)
+        self.leaf_type = np.array([row["leaf_type"] for row in rows], dtype=object)
+        self.tree_category = np.array([row["tree_category"] for row in rows], dtype=object)
+        for column in ("height", "width", "root_diameter", "crown_area", "co2_absorption"):
+            setattr(self, column, np.array([float(row[column]) for row in rows]))
+        for column in ("credit_value", "price"):
+            setattr(self, column, np.array([int(row[column]) for row in rows], dtype=np.int64))
+        self.plant_size = np.stack([self.height, self.width, self.root_diameter], axis=1)
+        #each cell is 0.5 meters so the radius in cells is half the width rounded up
+        self.radius = np.array([math.ceil(width / 2) for width in self.width.tolist()], dtype=np.int64)
+
+        self.evergreen = self.leaf_type == "Evergreen"
+        self.deciduous = self.leaf_type == "Deciduous"
+        self.large = self.tree_category == "Large"
+        self.native = self.tree_category == "Native"
+
+        self.site_masks = {}
+        for i, row in enumerate(rows):
+            for site in row["sites"].split():
+                self.site_masks.setdefault(site, np.zeros(len(rows), dtype=bool))[i] = True
+
+        for array in (self.species, self.leaf_type, self.tree_category, self.height, self.width, self.root_diameter,
+                      self.plant_size, self.credit_value, self.crown_area, self.co2_absorption, self.price, self.radius,
+                      self.evergreen, self.deciduous, self.large, self.native, *self.site_masks.values()):
+            array.flags.writeable = False
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Method to get the shared catalog of a data file
+
+        :param path (string): CSV file to load, the bundled species.csv if not given
+        :return: SpeciesCatalog object
+        """
+        path = path or cls.DATA_FILE
+        if path not in cls._loaded:
+            with open(path, "r", newline="") as f:
+                cls._loaded[path] = cls(list(csv.DictReader(f)))
+        return cls._loaded[path]
+
+    def __len__(self):
+        return len(self.names)
+
+    def mask(self, ids):
+        """
+        Method to build a boolean mask of tree type ids
+
+        :param ids (iterable): tree type ids to set
+        :return: boolean numpy array indexed by tree type id
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        mask[list(ids)] = True
+        return mask
+
+    def site_mask(self, site):
+        """
+        Method to get the mask of tree types planted on a site
+
+        :param site (string): site name, as in the sites column of the data file
+        :return: boolean numpy array indexed by tree type id
+        """
+        return self.site_masks[site]
+
+    def types_dict(self, mask=None):
+        """
+        Method to get a dictionary of tree type id -> name, as used by the genetic algorithm
+
+        :param mask (numpy array): optional boolean mask of the tree types to include, all tree types if not given
+        :return: dictionary of tree type id -> name
+        """
+        ids = range(len(self)) if mask is None else np.flatnonzero(mask).tolist()
+        return {i: self.names[i] for i in ids}
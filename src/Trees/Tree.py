@@ -1,50 +1,32 @@
-import math
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Trees.TreeFootprint import TreeFootprint
 
 class Tree:
     """
     Class to represent a tree. Each tree has a leaf type, planting location, plant size, species, credit value, crown area,
     CO2 absorption, price, tree category, and numerical representation. This Tree object is planted in the Grid object Square class.
+    A tree only stores its tree type id and planting location. Every other attribute is read from the shared species catalog,
+    so trees are cheap to create and hold no copies of the species data.
 
     Attributes:
-        leaf_type (string): String type of leaf the tree has
+        species_id (int): tree type id of the tree, its row in the species catalog
         planting_location (int, int): (x, y) coordinates of the location where tree is planted
-        plant_size (float, float, float): tuple of Floats (x, y, z) size of the tree where x is height, y is width, and z is diamoter of root
-        species (string): String species of the tree
-        credit_value (int): Integer credit value of the tree
-        crown_area (float): Float area of the crown
-        co2_absorption (float): Float amount of CO2 absorbed
-        price (int): Integer price of the tree
-        tree_category (string): String category of the tree being either screening, large, or native.
-        numerical_representation (int): Integer numerical representation of the tree
+        catalog (SpeciesCatalog): shared catalog of tree type attributes
     """
-    def __init__(self, leaf_type, planting_location, plant_size, species, credit_value, crown_area, co2_absorption, price, tree_category, numerical_representation):
+
+    __slots__ = ("species_id", "planting_location")
+
+    catalog = SpeciesCatalog.load()
+
+    def __init__(self, species_id, planting_location):
         """
         Constructor for the Tree class
 
-        :param leaf_type (string): String type of leaf the tree has
+        :param species_id (int): tree type id of the tree
         :param planting_location (int, int): (x, y) coordinates of the location where tree is planted
-        :param plant_size (float, float, float): tuple of Floats (x, y, z) size of the tree where x is height, y is width, and z is diamoter of root
-        :param species (string): String species of the tree
-        :param credit_value (int): Integer credit value of the tree
-        :param crown_area (float): Float area of the crown
-        :param co2_absorption (float): Float amount of CO2 absorbed
-        :param price (int): Integer price of the tree
-        :param tree_category (string): String category of the tree being either screening, large, or native.
-        :param numerical_representation (int): Integer numerical representation of the tree
-        """
-        self.leaf_type = leaf_type
+        """
+        self.species_id = species_id
         self.planting_location = planting_location
-        self.plant_size = plant_size
-        self.species = species
-        self.credit_value = credit_value
-        self.crown_area = crown_area
-        self.co2_absorption = co2_absorption
-        self.price = price
-        self.tree_category = tree_category
-        self.numerical_representation = numerical_representation
-        self.occupied = []
-        self.fillGridRadius(335, 514) #change to actual height
-        #self.fillGridRadius(202, 121)
 
     def getLeafType(self):
         """
@@ -52,7 +34,7 @@ class Tree:
 
         :return: type of leaf the tree has
         """
-        return self.leaf_type
+        return self.catalog.leaf_type[self.species_id]
 
     def getPlantingLocation(self):
         """
@@ -68,7 +50,7 @@ class Tree:
 
         :return: the size of the tree
         """
-        return self.plant_size
+        return tuple(self.catalog.plant_size[self.species_id].tolist())
 
     def getSpecies(self):
         """
@@ -76,7 +58,7 @@ class Tree:
 
         :return: species of the tree
         """
-        return self.species
+        return self.catalog.species[self.species_id]
 
     def getCreditValue(self):
         """
@@ -84,7 +66,7 @@ class Tree:
 
         :return: credit value of the tree
         """
-        return self.credit_value
+        return self.catalog.credit_value[self.species_id].item()
 
     def getCrownArea(self):
         """
@@ -92,7 +74,7 @@ class Tree:
 
         :return: area of the crown
         """
-        return self.crown_area
+        return self.catalog.crown_area[self.species_id].item()
 
     def getCo2Absorption(self):
         """
@@ -100,7 +82,7 @@ class Tree:
 
         :return: CO2 absorbed by the tree
         """
-        return self.co2_absorption
+        return self.catalog.co2_absorption[self.species_id].item()
 
     def getPrice(self):
         """
@@ -108,7 +90,7 @@ class Tree:
 
         :return: price of the tree
         """
-        return self.price
+        return self.catalog.price[self.species_id].item()
 
     def getTreeCategory(self):
         """
@@ -116,7 +98,7 @@ class Tree:
 
         :return: category of the tree
         """
-        return self.tree_category
+        return self.catalog.tree_category[self.species_id]
 
     def getNumericalRepresentation(self):
         """
@@ -124,33 +106,33 @@ class Tree:
 
         :return: numerical representation of the tree
         """
-        return self.numerical_representation
+        return self.species_id
 
-    def fillGridRadius(self, grid_width, grid_height):
+    def getRadius(self):
         """
-        Method to fill the grid with the tree's radius. only take a subset of the total
-        grid space to improve on time complexity
+        Method to get the radius of the tree footprint in squares
 
-        :return: the grid with the tree's radius
+        :return: radius of the tree footprint
         """
+        return self.catalog.radius[self.species_id].item()
 
-        radius = math.ceil(self.getPlantSize()[1] / 2) #each cell is 0.5 meters so / 2 instead of 4
-        center_x, center_y = self.getPlantingLocation()
-        min_x = max(0, center_x - radius)
-        max_x = min(grid_width - 1, center_x + radius)
-        min_y = max(0, center_y - radius)
-        max_y = min(grid_height - 1, center_y + radius)
+    def fillGridRadius(self, grid_width, grid_height):
+        """
+        Method to get the squares covered by the tree's radius. The disk is taken from the footprint cache and clipped to
+        the grid, so only the squares inside the grid are returned
 
-        for i in range(min_y, max_y + 1):
-            for j in range(min_x, max_x + 1):
-                if (i - center_y)**2 + (j - center_x)**2 <= radius**2:
-                    self.occupied.append([i, j]) # to represent type of tree and area occupied by that tree print -1 * numerical_representation
+        :param grid_width (int): x size of the grid
+        :param grid_height (int): y size of the grid
+        :return: (rows, columns) index arrays of the squares covered by the tree
+        """
+        return TreeFootprint.footprint(self.getRadius(), self.getPlantingLocation(), grid_width, grid_height)
 
-    def returnOccupiedSpots(self):
+    def returnOccupiedSpots(self, grid_width, grid_height):
         """
         Method to return the occupied spots by the tree
 
-        :return: the occupied spots by the tree
+        :param grid_width (int): x size of the grid
+        :param grid_height (int): y size of the grid
+        :return: (rows, columns) index arrays of the occupied spots, and the negative numerical representation
         """
-        return self.occupied, -1 * self.getNumericalRepresentation()
-
+        return self.fillGridRadius(grid_width, grid_height), -1 * self.getNumericalRepresentation()
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class TreeFootprint:
+    """
+    Class to cache the footprint of a tree. A footprint is the disk of squares a tree covers around its base. The disk offsets
+    only depend on the tree radius, so they are computed once per radius as NumPy arrays and then shifted to the tree base and
+    clipped to the bounds of the site for every tree.
+
+    Attributes:
+        stencils (dict): radius -> (row offsets, column offsets) of the disk, in row by row order
+    """
+
+    stencils = {}
+
+    @classmethod
+    def stencil(cls, radius):
+        """
+        Method to get the disk offsets of a radius, computing them on first use
+
+        :param radius (int): radius of the disk in squares
+        :return: (row offsets, column offsets) as read-only int numpy arrays
+        """
+        if radius not in cls.stencils:
+            rows, cols = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+            inside = rows**2 + cols**2 <= radius**2
+            offsets = (rows[inside], cols[inside])
+            for offset in offsets:
+                offset.flags.writeable = False
+            cls.stencils[radius] = offsets
+        return cls.stencils[radius]
+
+    @classmethod
+    def footprint(cls, radius, center, width, height):
+        """
+        Method to get the squares covered by a tree, clipped to the site
+
+        :param radius (int): radius of the tree in squares
+        :param center (int, int): (x, y) coordinates of the tree base
+        :param width (int): x size of the site
+        :param height (int): y size of the site
+        :return: (rows, columns) index arrays of the covered squares, usable as grid[rows, columns]
+        """
+        row_offsets, col_offsets = cls.stencil(radius)
+        center_x, center_y = center
+        rows = row_offsets + center_y
+        cols = col_offsets + center_x
+        if center_x - radius < 0 or center_y - radius < 0 or center_x + radius >= width or center_y + radius >= height:
+            inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+            rows = rows[inside]
+            cols = cols[inside]
+        return rows, cols
+
+    @classmethod
+    def erode(cls, free, radius):
+        """
+        Method to find the squares a tree can have its base on, given the squares its footprint may cover. Squares of a
+        footprint outside the array are ignored, as they are when a tree is planted.
+
+        :param free (numpy array): 2D boolean array of the squares a footprint may cover
+        :param radius (int): radius of the tree in squares
+        :return: 2D boolean numpy array of the same shape, true where the whole footprint is on free squares
+        """
+        height, width = free.shape
+        padded = np.ones((height + 2 * radius, width + 2 * radius), dtype=bool)
+        padded[radius:radius + height, radius:radius + width] = free
+        fits = np.ones((height, width), dtype=bool)
+        for row_offset, col_offset in zip(*cls.stencil(radius)):
+            fits &= padded[radius + row_offset:radius + row_offset + height, radius + col_offset:radius + col_offset + width]
+        return fits
@@ -15,7 +15,8 @@ class SingletonMeta(type):
 class TreeGenerator(metaclass=SingletonMeta):
     """
     Class to generate trees. Several functions to generate trees are defined here. The input is only the (x, y)
-    coordinates of the location where the tree is planted. The function name is the species to generate.
+    coordinates of the location where the tree is planted. The function name is the species to generate. The attributes of
+    each species are kept in the species catalog, so generating a tree only records its tree type id and location.
     """
 
     def __init__(self):
@@ -26,56 +27,15 @@ class TreeGenerator(metaclass=SingletonMeta):
 
     def generateTree(self, species, planting_location):
         """
-        Method to generate trees
+        Method to generate trees by looking up the tree type id of a species name in the species catalog
 
-        :param species (int): species of the tree
+        :param species (string): species name of the tree, as in the tree types dictionary
         :param planting_location (int, int): (x, y) coordinates of the location where tree is planted
-        :return: Tree object
+        :return: Tree object, or None if the species is not in the catalog
         """
-        if species == "Abies Holophylla":
-            return self.abiesHolophylla(planting_location)
-        elif species == "Pinus Desniflora1":
-            return self.pinusDesniflora1(planting_location)
-        elif species == "Pinus Desniflora2":
-            return self.pinusDesniflora2(planting_location)
-        elif species == "Pinus Desniflora Globosa":
-            return self.pinusDesnifloraGlobosa(planting_location)
-        elif species == "Taxus Cuspidata":
-            return self.taxusCuspidata(planting_location)
-        elif species == "White Pine":
-            return self.whitePine(planting_location)
-        elif species == "Acer Palmatum":
-            return self.acerPalmatum(planting_location)
-        elif species == "Betula Platyphylla":
-            return self.betulaPlatyphylla(planting_location)
-        elif species == "Cercidiphyllum Japonicum":
-            return self.cercidiphyllumJaponicum(planting_location)
-        elif species == "Chaenomeless Sinensis":
-            return self.chaenomelessSinensis(planting_location)
-        elif species == "Chionanthus Retusus":
-            return self.chionanthusRetusus(planting_location)
-        elif species == "Cornus Officinalis":
-            return self.cornusOfficinalis(planting_location)
-        elif species == "Ginkgo Biloba":
-            return self.ginkgoBiloba(planting_location)
-        elif species == "Kobus Magnolia":
-            return self.kobusMagnolia(planting_location)
-        elif species == "Liriodendron Tulipifera":
-            return self.liriodendronTulipifera(planting_location)
-        elif species == "Oak":
-            return self.oak(planting_location)
-        elif species == "Persimmon":
-            return self.persimmon(planting_location)
-        elif species == "Prunus Armeniaca":
-            return self.prunusArmeniaca(planting_location)
-        elif species == "Prunus Yedoensis":
-            return self.prunusYedoensis(planting_location)
-        elif species == "Sophora Japonica":
-            return self.sophoraJaponica(planting_location)
-        elif species == "Zelkova Serrata":
-            return self.zelkovaSerrata(planting_location)
-        elif species == "None":
-            return self.none(planting_location)
+        species_id = Tree.catalog.ids.get(species)
+        if species_id is not None:
+            return Tree(species_id, planting_location)
 
     def abiesHolophylla(self, planting_location):
         """
@@ -84,7 +44,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (3.0, 1.5, 7.0), "Abies Holphylla",1, 1.8, 2.2, 135, "Screen", 1)
+        return Tree(1, planting_location)
 
     def pinusDesniflora1(self, planting_location):
         """
@@ -93,7 +53,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (8.0, 5.6, 25.0), "Pinus Desniflora1", 4, 24.6, 5.4, 1949, "Large", 2)
+        return Tree(2, planting_location)
 
     def pinusDesniflora2(self, planting_location):
         """
@@ -102,7 +62,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (8.0, 5.6, 30.0), "Pinus Desniflora2", 4, 24.6, 5.4, 2881, "Large", 3)
+        return Tree(3, planting_location)
 
     def pinusDesnifloraGlobosa(self, planting_location):
         """
@@ -111,7 +71,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (2.0, 2.5, 15.0), "Pinus Desniflora Globosa", 1, 4.9, 5.4, 1398, "None", 4)
+        return Tree(4, planting_location)
 
     def taxusCuspidata(self, planting_location):
         """
@@ -120,7 +80,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (3.0, 2.0, 7.0), "Taxus Cuspidata", 1, 3.1, 0.5, 1864, "None", 5)
+        return Tree(5, planting_location)
 
     def whitePine(self, planting_location):
         """
@@ -129,7 +89,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Evergreen", planting_location, (3.0, 1.5, 8.0), "White Pine", 1, 3.1, 3.8, 57, "Screen", 6)
+        return Tree(6, planting_location)
 
     def acerPalmatum(self, planting_location):
         """
@@ -138,7 +98,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.0, 2.8, 20.0), "Acer Palmatum", 4, 6.2, 3.1, 796, "Large", 7)
+        return Tree(7, planting_location)
 
     def betulaPlatyphylla(self, planting_location):
         """
@@ -147,7 +107,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (5.0, 3.5, 12.0), "Betula Platyphylla", 1, 9.6, 3.8, 279, "None", 8)
+        return Tree(8, planting_location)
 
     def cercidiphyllumJaponicum(self, planting_location):
         """
@@ -156,7 +116,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.5, 3.2, 15.0), "Cercidiphyllum Japonicum", 2, 8.0, 3.8, 423, "None", 9)
+        return Tree(9, planting_location)
 
     def chaenomelessSinensis(self, planting_location):
         """
@@ -165,7 +125,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.0, 2.8, 15.0), "Chaenomeless Sinensis", 2, 6.2, 3.8, 381, "None", 10)
+        return Tree(10, planting_location)
 
     def chionanthusRetusus(self, planting_location):
         """
@@ -174,7 +134,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.0, 2.8, 15.0), "Chionanthus Retusus", 2, 6.2, 3.5, 550, "None", 11)
+        return Tree(11, planting_location)
 
     def cornusOfficinalis(self, planting_location):
         """
@@ -183,7 +143,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (3.0, 1.5, 10.0), "Cornus Officinalis", 1, 1.8, 2.9, 211, "None", 12)
+        return Tree(12, planting_location)
 
     def ginkgoBiloba(self, planting_location):
         """
@@ -192,7 +152,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (5.0, 3.5, 15.0), "Ginkgo Biloba", 2, 9.6, 4.5, 406, "Native", 13)
+        return Tree(13, planting_location)
 
     def kobusMagnolia(self, planting_location):
         """
@@ -201,7 +161,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (3.5, 3.5, 15.0), "Kobus Magnolia", 2,  9.6, 3.8, 423, "None", 14)
+        return Tree(14, planting_location)
 
     def liriodendronTulipifera(self, planting_location):
         """
@@ -210,7 +170,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (5.0, 3.5, 15.0), "Liriodendron Tulipifera", 2, 9.6, 3.8, 389, "None", 15)
+        return Tree(15, planting_location)
 
     def oak(self, planting_location):
         """
@@ -219,7 +179,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.0, 2.8, 15.0), "Oak", 2, 6.2, 3.8, 423, "None", 16)
+        return Tree(16, planting_location)
 
     def persimmon(self, planting_location):
         """
@@ -228,7 +188,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (3.5, 2.5, 12.0), "Persimmon", 1, 4.9, 3.8, 186, "None", 17)
+        return Tree(17, planting_location)
 
     def prunusArmeniaca(self, planting_location):
         """
@@ -237,7 +197,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (2.5, 1.8, 6.0), "Prunus Armeniaca", 1, 2.5, 3.8, 55, "None", 18)
+        return Tree(18, planting_location)
 
     def prunusYedoensis(self, planting_location):
         """
@@ -246,7 +206,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.5, 3.2, 15.0), "Prunus Yedoensis", 2, 8.0, 9.0, 576, "None", 19)
+        return Tree(19, planting_location)
 
     def sophoraJaponica(self, planting_location):
         """
@@ -255,7 +215,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (4.5, 3.2, 15.0), "Sophora Japonica", 2, 8.0, 3.8, 322, "Native", 20)
+        return Tree(20, planting_location)
 
     def zelkovaSerrata(self, planting_location):
         """
@@ -264,7 +224,7 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("Deciduous", planting_location, (5.0, 3.5, 30.0), "Zelkova Serrata", 4, 9.6, 14.8, 1949, "Large", 21)
+        return Tree(21, planting_location)
 
     def none(self, planting_location):
         """
@@ -273,4 +233,4 @@ class TreeGenerator(metaclass=SingletonMeta):
         :param plantingLocation: (x, y) coordinates of the location where tree is planted
         :return: Tree object
         """
-        return Tree("", planting_location, (0, 0, 0), "None", 0, 0, 0, 0, "", 0)
\ No newline at end of file
+        return Tree(0, planting_location)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import numpy as np
+from Trees.TreeFootprint import TreeFootprint
 from Trees.TreeGenerator import TreeGenerator
 import matplotlib.pyplot as plt
 from matplotlib.colors import ListedColormap
@@ -23,43 +24,66 @@ class TreeSpacing:
 
     def update_coords(self, fill_cords, grid, numerical_representation, center, env):
         """
-        This function updates the grid with the new tree. It checks if the tree can be planted in the given location.
+        This function updates the grid with the new tree. It checks if the tree can be planted in the given location. The
+        squares written are logged to the open transaction of the grid object, if any.
 
-        :param fill_cords (list): a list of coordinates that are occupied by the tree
+        :param fill_cords (numpy array, numpy array): (rows, columns) index arrays of the squares occupied by the tree
         :param grid (numpy array): the grid that is being updated. the numerical representation
         :param numerical_representation (numpy array): the numerical representation of the tree
         :param center (int, int): the center of the tree (x, y) coordinates
         :param env (Grid object): the grid object that is being updated
         :return: numpy array grid, boolean plantable
         """
-        plantable = True
-        for coord in fill_cords:
-            y, x = coord
-            if grid[y][x] != 0 or env.grid[y][x].is_plantable() is False:
-                plantable = False
-                break
+        rows, cols = fill_cords
+        plantable = not grid[rows, cols].any() and bool(env.site.plantable[rows, cols].all())
         if plantable:
-            for coord in fill_cords:
-                y, x = coord
-                grid[y][x] = numerical_representation #change grid of surrounding tree radius to negative (occupied)
+            env.log_cells(rows, cols)
+            grid[rows, cols] = numerical_representation #change grid of surrounding tree radius to negative (occupied)
             x, y = center
-            grid[y][x] = abs(numerical_representation) #change base of tree to its positive representation
+            grid[y, x] = abs(numerical_representation) #change base of tree to its positive representation
         return grid, plantable
 
+    def fits_many(self, radius, xs, ys, grid, env):
+        """
+        This function tests one tree type at many candidate bases at once. The footprint stencil is shifted to every candidate
+        and checked against the planting state and the plantable layer with one array expression. Squares of a footprint
+        outside the grid are ignored, as they are for a single tree.
+
+        :param radius (int): footprint radius of the tree type, in squares
+        :param xs (numpy array): x coordinates of the candidate bases
+        :param ys (numpy array): y coordinates of the candidate bases
+        :param grid (numpy array): the numerical representation of the grid
+        :param env (Grid object): the grid object whose site gives the plantable layer
+        :return: boolean numpy array, true where the tree fits
+        """
+        row_offsets, col_offsets = TreeFootprint.stencil(radius)
+        height, width = grid.shape
+        rows = np.asarray(ys)[:, None] + row_offsets
+        cols = np.asarray(xs)[:, None] + col_offsets
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        rows = np.clip(rows, 0, height - 1)
+        cols = np.clip(cols, 0, width - 1)
+        blocked = (grid[rows, cols] != 0) | ~env.site.plantable[rows, cols]
+        return ~(blocked & inside).any(axis=1)
+
     def remove_tree(self, fill_cords, grid, env):
         """
-        This function removes a tree from the grid. It updates the grid and the environment object.
+        This function removes a tree from the grid. It updates the grid and the environment object. Only the planting state
+        changes, the static plantable layer of the environment is left as is. The squares written are logged to the open
+        transaction of the grid object, if any.
 
-        :param fill_cords (list): a list of coordinates that are occupied by the tree
+        :param fill_cords (numpy array, numpy array): (rows, columns) index arrays of the squares occupied by the tree
         :param grid (numpy array): the grid that is being updated. the numerical representation
         :param env (Grid object): the grid object that is being updated
         :return: grid (numpy array)
         """
-        for coord in fill_cords:
-            y, x = coord
-            grid[y][x] = 0
-            env.grid[y][x].tree = None
-            env.grid[y][x].plantable = True
+        rows, cols = fill_cords
+        #the only tree base in a footprint is the base of the tree itself
+        bases = grid[rows, cols] > 0
+        for x, y in zip(cols[bases].tolist(), rows[bases].tolist()):
+            env.unplant(x, y)
+        env.log_cells(rows, cols)
+        grid[rows, cols] = 0
         return grid
 
     def generate_tree_radius_png(self):
@@ -72,7 +96,7 @@ class TreeSpacing:
             #crate tree
             grid = np.zeros((9, 9))
             tree = TreeGenerator().generateTree(self.tree_types_dict[i], (4, 4))
-            occupied, numerical_representation = tree.returnOccupiedSpots()
+            occupied, numerical_representation = tree.returnOccupiedSpots(len(grid[0]), len(grid))
             grid, plantable = self.update_coords(occupied, grid, numerical_representation, tree.getPlantingLocation())
 
             # Define a color map: 1 is green and 0 is white
@@ -0,0 +1,78 @@
+import os
+import sys
+
+#the modules are imported from the src folder, the same as when Run.py is run from it
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+
+def edinburgh_run(population_size=8, **options):
+    """
+    Method to set up a small run of the Edinburgh scenario the same way run_edinburgh_scenario does
+
+    :param population_size (int): number of individuals in the population
+    :param options: attributes of CustomGeneticChanges to set, such as evaluation_backend or checkpoint_path
+    :return: (genetic, toolbox, fitness_eval, fitness_cache)
+    """
+    from deap import base, creator, tools
+    from Constraints.EdinburghConstraints import EdinburghConstraints
+    from Environment.Site import Site
+    from GeneticAlgorithm.CustomGeneticChanges import CustomGeneticChanges
+    from GeneticAlgorithm.EvaluationBackend import create_backend
+    from GeneticAlgorithm.FitnessCache import FitnessCache
+    from Trees.SpeciesCatalog import SpeciesCatalog
+    from Trees.TreeGenerator import TreeGenerator
+
+    catalog = SpeciesCatalog.load()
+    tree_types_dict = catalog.types_dict(catalog.site_mask("park"))
+    site = Site.load(3)
+    generator = TreeGenerator()
+    genetic = CustomGeneticChanges(site.x, site.y, tree_types_dict, generator, 3)
+    for name, value in options.items():
+        setattr(genetic, name, value)
+    fitness_eval = EdinburghConstraints(site.x, site.y, 50000, tree_types_dict, generator)
+
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax, grid=None)
+    toolbox = base.Toolbox()
+    toolbox.register("population", genetic.init_population, fitness_eval, "init_grid_edinburgh")
+    backend = create_backend(genetic.evaluation_backend, fitness_eval, site.x, site.y, 3, genetic.evaluation_workers,
+                             genetic.evaluation_chunksize)
+    fitness_cache = FitnessCache(backend, genetic.fitness_cache_size)
+    toolbox.register("evaluate", fitness_cache)
+    toolbox.register("mate", genetic.mate)
+    toolbox.register("mutate", genetic.mutate, indpb=0.05)
+    toolbox.register("select", tools.selTournament, tournsize=3)
+    genetic.create_arena(population_size)
+    return genetic, toolbox, fitness_eval, fitness_cache
+
+
+def evolve(ngen, seed=0, population_size=8, **options):
+    """
+    Method to run a small Edinburgh run from a seeded random module
+
+    :param ngen (int): number of generations
+    :param seed (int): seed of the random module the run draws from
+    :param population_size (int): number of individuals in the population
+    :param options: attributes of CustomGeneticChanges to set
+    :return: (population, avg_scores, best_scores) at the end of the run
+    """
+    import random
+    genetic, toolbox, fitness_eval, fitness_cache = edinburgh_run(population_size, **options)
+    #seeded after the modules are imported, as some of them seed the random module when they are first imported
+    random.seed(seed)
+    try:
+        return genetic.evolve(toolbox, fitness_eval, fitness_cache, population_size, ngen, max)
+    finally:
+        fitness_cache.backend.close()
+
+
+def layouts(population):
+    """
+    Method to get what identifies a population: the trees and the fitness of every individual, in order
+
+    :param population (list): individuals
+    :return: list of (TREE_RECORD records as a list, fitness values)
+    """
+    return [(individual.grid.records().tolist(), individual.fitness.values) for individual in population]
@@ -0,0 +1,30 @@
+import json
+from conftest import evolve, layouts
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path):
+    population, avg_scores, best_scores = evolve(4)
+
+    checkpoint_path = str(tmp_path / "run.npz")
+    evolve(2, checkpoint_path=checkpoint_path)
+    #the resumed run must take its random state from the checkpoint, not from the seed it is started with
+    resumed, resumed_avg, resumed_best = evolve(4, seed=1, checkpoint_path=checkpoint_path, resume=True)
+
+    assert layouts(resumed) == layouts(population)
+    assert resumed_avg == avg_scores
+    assert resumed_best == best_scores
+
+
+def test_resume_drops_metrics_of_generations_run_again(tmp_path):
+    checkpoint_path = str(tmp_path / "run.npz")
+    metrics_path = str(tmp_path / "metrics.jsonl")
+    evolve(2, checkpoint_path=checkpoint_path, metrics_path=metrics_path)
+    #a run stopped after the checkpoint had already written the metrics of a later generation
+    with open(metrics_path) as f:
+        last = json.loads(f.readlines()[-1])
+    with open(metrics_path, "a") as f:
+        f.write(json.dumps(dict(last, generation=2)) + "\n")
+
+    evolve(4, checkpoint_path=checkpoint_path, metrics_path=metrics_path, resume=True)
+    with open(metrics_path) as f:
+        assert [json.loads(line)["generation"] for line in f] == [0, 1, 2, 3]
@@ -0,0 +1,12 @@
+import pytest
+from conftest import evolve, layouts
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_backend_matches_serial(backend):
+    population, avg_scores, best_scores = evolve(2)
+    pooled, pooled_avg, pooled_best = evolve(2, evaluation_backend=backend, evaluation_workers=2,
+                                             evaluation_chunksize=3)
+    assert layouts(pooled) == layouts(population)
+    assert pooled_avg == avg_scores
+    assert pooled_best == best_scores
@@ -0,0 +1,57 @@
+import json
+import os
+import numpy as np
+import pytest
+from conftest import SRC_DIR
+from Constraints.ScenarioOneConstraints import ScenarioOneConstraints
+from Constraints.ScenarioTwoConstraints import ScenarioTwoConstraints
+from Environment.Grid import Grid
+from Trees.SpeciesCatalog import SpeciesCatalog
+from Trees.TreeGenerator import TreeGenerator
+
+RESULTS_DIR = os.path.join(SRC_DIR, "Results")
+
+#fitness of every stored best grid under scenario one and scenario two, as the original per-square evaluate computed it
+BASELINE_FITNESS = {
+    "best_grid_250_pop.json": ("999999", "-100"),
+    "best_grid_500_pop.json": ("999999", "-100"),
+    "best_grid_s2_250.json": ("528072", "4581.500000000022"),
+    "best_grid_s2_500.json": ("528864", "4546.100000000027"),
+    "best_grid_scenario_one_1k.json": ("401201", "3570.700000000013"),
+    "best_grid_scenario_one_1k_50gen.json": ("378746", "3505.6000000000117"),
+    "best_grid_scenario_one_250.json": ("419166", "3524.500000000016"),
+    "best_grid_scenario_one_500.json": ("383523", "3504.1000000000117"),
+    "best_grid_scenario_one_500_50gen.json": ("383523", "3504.1000000000117"),
+}
+
+
+class Layout:
+    """
+    Individual holding only a grid, which is all evaluate reads
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+
+def load_result(name, scenario):
+    grid = Grid(335, 514, scenario)
+    with open(os.path.join(RESULTS_DIR, name)) as f:
+        grid.load_raster(np.array(json.load(f)))
+    return Layout(grid)
+
+
+def test_every_result_has_a_baseline():
+    assert sorted(name for name in os.listdir(RESULTS_DIR) if name.endswith(".json")) == sorted(BASELINE_FITNESS)
+
+
+@pytest.mark.parametrize("name", sorted(BASELINE_FITNESS))
+def test_scenario_one_fitness_is_bit_identical(name):
+    fitness_eval = ScenarioOneConstraints(335, 514, 3500, SpeciesCatalog.load().types_dict(), TreeGenerator())
+    assert repr(fitness_eval.evaluate(load_result(name, 1))[0]) == BASELINE_FITNESS[name][0]
+
+
+@pytest.mark.parametrize("name", sorted(BASELINE_FITNESS))
+def test_scenario_two_fitness_is_bit_identical(name):
+    fitness_eval = ScenarioTwoConstraints(335, 514, 530000, SpeciesCatalog.load().types_dict(), TreeGenerator())
+    assert repr(fitness_eval.evaluate(load_result(name, 2))[0]) == BASELINE_FITNESS[name][1]
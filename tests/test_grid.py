@@ -0,0 +1,25 @@
+import gc
+import weakref
+import numpy as np
+from Environment.Grid import Grid
+from Environment.PopulationArena import PopulationArena
+from GeneticAlgorithm.AlgorithmMutations import AlgorithmMutations
+
+
+def test_grid_with_feasibility_index_hands_back_its_arena_slot_when_dropped():
+    arena = PopulationArena(335, 514, 2)
+    grid = Grid(335, 514, 1, arena)
+    mutations = AlgorithmMutations(Grid.tree_types_dict, grid)
+    ys, xs = np.nonzero(grid.site.fit_map(1))
+    mutations.plant_tree(13, int(xs[0]), int(ys[0]))
+    mutations.local_search(13, int(xs[0]), int(ys[0]))
+    assert grid._feasibility is not None and arena.slots_in_use() == 1
+
+    dropped = weakref.ref(grid)
+    gc.disable()
+    try:
+        del grid, mutations
+        assert dropped() is None
+        assert arena.slots_in_use() == 0
+    finally:
+        gc.enable()
@@ -0,0 +1,8 @@
+import pytest
+from conftest import evolve, layouts
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_population_is_the_same_for_any_number_of_workers(workers):
+    population, _, _ = evolve(0)
+    assert layouts(evolve(0, init_workers=workers)[0]) == layouts(population)